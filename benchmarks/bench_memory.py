@@ -0,0 +1,68 @@
+import argparse
+import os
+import random
+import sys
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from map_manager import BACKENDS, MapManager
+from point import MapPoint
+
+
+class _LegacyPoint:
+    def __init__(self, point: MapPoint):
+        self._id = point.id
+        self._latitude = point.latitude
+        self._latitude_hemisphere = point.latitude_hemisphere
+        self._longitude = point.longitude
+        self._longitude_hemisphere = point.longitude_hemisphere
+        self._location_name = point.location_name
+        self._surface = point.surface
+
+
+def _bytes_per_point(factory, count: int) -> float:
+    tracemalloc.start()
+    items = [factory() for _ in range(count)]
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return used / count
+
+
+def _manager_bytes_per_point(backend: str, count: int, seed: int) -> float:
+    tracemalloc.start()
+    manager = MapManager(backend=backend, capacity_mode='unlimited')
+    manager.fill_random_points(count, reset_ids=True, seed=seed)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del manager
+    return used / count
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Пам'ять на одну точку: MapPoint до і після __slots__ та сховища MapManager")
+    parser.add_argument("-n", "--count", type=int, default=10 ** 6)
+    parser.add_argument("--seed", type=int, default=12345)
+    args = parser.parse_args(argv)
+
+    os.chdir(ROOT)
+    random.seed(args.seed)
+    legacy = _bytes_per_point(lambda: _LegacyPoint(MapPoint()), args.count)
+    random.seed(args.seed)
+    compact = _bytes_per_point(MapPoint, args.count)
+
+    print(f"Точок: {args.count}")
+    print(f"До (__dict__ + рядки):        {legacy:8.1f} байт/точку")
+    print(f"Після (__slots__ + коди):     {compact:8.1f} байт/точку")
+    print(f"Економія:                     {100 * (1 - compact / legacy):7.1f}%")
+
+    per_backend = {backend: _manager_bytes_per_point(backend, args.count, args.seed) for backend in BACKENDS}
+    for backend, used in per_backend.items():
+        print(f"{f'MapManager({backend!r}):':30s}{used:8.1f} байт/точку")
+    print(f"{'Колонковий індекс, надбавка:':30s}{per_backend['columnar'] - per_backend['linked']:8.1f} байт/точку")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from linked_list import LinkedList
+from map_manager import MapManager
+from point import MapPoint
+
+DEFAULT_SIZES = (10, 100, 1000, 10 ** 4, 10 ** 5, 10 ** 6)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+Case = Callable[[int, random.Random], Tuple[Callable[[], object], int]]
+CASES: Dict[str, Case] = {}
+ONE_SHOT = set()
+GUI_CASES = ('gui.update_points_list', 'gui.draw_map')
+
+
+def case(name: str, repeatable: bool = True):
+    def register(fn: Case) -> Case:
+        CASES[name] = fn
+        if not repeatable:
+            ONE_SHOT.add(name)
+        return fn
+    return register
+
+
+def _probe_count(size: int) -> int:
+    return max(10, min(1000, 10 ** 7 // size))
+
+
+def _filled_manager(size: int, seed: int) -> MapManager:
+    manager = MapManager(capacity_mode='unlimited')
+    manager.fill_random_points(size, reset_ids=True, seed=seed)
+    return manager
+
+
+@case('linked_list.append')
+def _bench_ll_append(size, rng):
+    items = list(range(size))
+
+    def run():
+        lst = LinkedList()
+        for item in items:
+            lst.append(item)
+    return run, size
+
+
+@case('linked_list.getitem')
+def _bench_ll_getitem(size, rng):
+    lst = LinkedList(range(size))
+    probes = [rng.randrange(size) for _ in range(_probe_count(size))]
+
+    def run():
+        for i in probes:
+            lst[i]
+    return run, len(probes)
+
+
+@case('linked_list.remove', repeatable=False)
+def _bench_ll_remove(size, rng):
+    lst = LinkedList(range(size))
+    count = min(size, _probe_count(size))
+    probes = [rng.randrange(size - k) for k in range(count)]
+
+    def run():
+        for i in probes:
+            lst.remove(i)
+    return run, count
+
+
+@case('map_point.construct')
+def _bench_point_construct(size, rng):
+    def run():
+        for _ in range(size):
+            MapPoint()
+    return run, size
+
+
+@case('map_point.recalculate_surface')
+def _bench_point_surface(size, rng):
+    points = [MapPoint() for _ in range(size)]
+    for i, p in enumerate(points):
+        p._location_name = f"{p.location_name} {i}"
+    classifier = MapPoint.get_surface_classifier()
+
+    def run():
+        classifier.cache_clear()
+        for p in points:
+            p._recalculate_surface()
+    return run, size
+
+
+@case('map_point.recalculate_surface_cached')
+def _bench_point_surface_cached(size, rng):
+    points = [MapPoint() for _ in range(size)]
+    for p in points:
+        p._recalculate_surface()
+
+    def run():
+        for p in points:
+            p._recalculate_surface()
+    return run, size
+
+
+@case('map_manager.fill_random_points')
+def _bench_fill(size, rng):
+    manager = MapManager(capacity_mode='unlimited')
+    seed = rng.randrange(2 ** 32)
+    return lambda: manager.fill_random_points(size, reset_ids=True, seed=seed), size
+
+
+@case('map_manager.filter_by')
+def _bench_filter(size, rng):
+    manager = _filled_manager(size, rng.randrange(2 ** 32))
+    criteria = [('surface', 'океан'), ('surface', 'материк'), ('hem_lat', 'S'), ('hem_lon', 'E')]
+    manager.filter_by(*criteria[0])
+
+    def run():
+        for key, value in criteria:
+            manager.filter_by(key, value)
+    return run, len(criteria)
+
+
+@case('map_manager.sort_by_location_name', repeatable=False)
+def _bench_sort(size, rng):
+    manager = _filled_manager(size, rng.randrange(2 ** 32))
+    return manager.sort_by_location_name, 1
+
+
+@case('map_manager.get_point_by_id')
+def _bench_get_by_id(size, rng):
+    manager = _filled_manager(size, rng.randrange(2 ** 32))
+    probes = [rng.randrange(size) for _ in range(1000)]
+
+    def run():
+        for pid in probes:
+            manager.get_point_by_id(pid)
+    return run, len(probes)
+
+
+_app = None
+
+
+def _gui_app():
+    global _app
+    if _app is None:
+        import warnings
+        from tkinter import messagebox
+        import gui_app
+        messagebox.showwarning = lambda *a, **k: None
+        warnings.simplefilter('ignore')
+        _app = gui_app.App()
+        _app.geometry("1000x700")
+        _settle(_app)
+    return _app
+
+
+def _settle(app) -> None:
+    while True:
+        app.update()
+        if not app._tasks.busy:
+            return
+        time.sleep(0.001)
+
+
+@case('gui.update_points_list', repeatable=False)
+def _bench_gui_list(size, rng):
+    app = _gui_app()
+    app.manager = _filled_manager(size, rng.randrange(2 ** 32))
+    app._reset_tree()
+
+    def run():
+        app.update_points_list()
+        _settle(app)
+    return run, 1
+
+
+@case('gui.draw_map', repeatable=False)
+def _bench_gui_map(size, rng):
+    app = _gui_app()
+    app.manager = _filled_manager(size, rng.randrange(2 ** 32))
+    app.map_canvas.delete("all")
+    app._drawn_markers.clear()
+    app._static_size = None
+
+    def run():
+        app.draw_map()
+        _settle(app)
+    return run, 1
+
+
+def _timed(fn: Callable[[], object], loops: int) -> float:
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        return time.perf_counter() - start
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _calibrate(fn: Callable[[], object], min_time: float) -> int:
+    loops = 1
+    while True:
+        for step in (1, 2, 5):
+            if _timed(fn, loops * step) >= min_time:
+                return loops * step
+        loops *= 10
+
+
+def _measure_one_shot(name: str, size: int, rng: random.Random, min_time: float) -> Tuple[float, int, int]:
+    deadline = time.perf_counter() + 10 * min_time
+    total = 0.0
+    calls = ops = 0
+    while calls == 0 or (total < min_time and time.perf_counter() < deadline):
+        fn, ops = CASES[name](size, rng)
+        total += _timed(fn, 1)
+        calls += 1
+    return total / calls, calls, ops
+
+
+def measure(name: str, size: int, seed: int, round_no: int, min_time: float = 0.2,
+            loops: int = 0) -> Tuple[float, int, int]:
+    random.seed(seed)
+    MapPoint.reset_instance_counter()
+    rng = random.Random(seed + round_no)
+    if name in ONE_SHOT:
+        return _measure_one_shot(name, size, rng, min_time)
+    fn, ops = CASES[name](size, rng)
+    if not loops:
+        loops = _calibrate(fn, min_time)
+    return _timed(fn, loops) / loops, loops, ops
+
+
+def run_cases(jobs: List[Tuple[str, int]], repeat: int, seed: int, min_time: float = 0.2) -> List[dict]:
+    timings: Dict[Tuple[str, int], List[float]] = {job: [] for job in jobs}
+    loops: Dict[Tuple[str, int], int] = {}
+    ops: Dict[Tuple[str, int], int] = {}
+    for r in range(repeat):
+        print(f"Прохід {r + 1}/{repeat}", file=sys.stderr)
+        for job in jobs:
+            per_call, loops[job], ops[job] = measure(*job, seed, r, min_time, loops.get(job, 0))
+            timings[job].append(per_call)
+    results = []
+    for job in jobs:
+        median = statistics.median(timings[job])
+        results.append({
+            'name': job[0],
+            'size': job[1],
+            'ops': ops[job],
+            'repeat': repeat,
+            'loops': loops[job],
+            'best_s': min(timings[job]),
+            'median_s': median,
+            'per_op_us': median / ops[job] * 1e6,
+        })
+    return results
+
+
+def gui_available() -> bool:
+    try:
+        import tkinter
+        tkinter.Tk().destroy()
+        return True
+    except Exception:
+        return False
+
+
+def compare(results: List[dict], baseline: dict) -> List[Tuple[dict, Optional[float]]]:
+    base = {(r['name'], r['size']): r for r in baseline.get('results', [])}
+    rows = []
+    for r in results:
+        ref = base.get((r['name'], r['size']))
+        rows.append((r, r['per_op_us'] / ref['per_op_us'] if ref and ref['per_op_us'] > 0 else None))
+    return rows
+
+
+def save_baseline(report: dict, path: str) -> None:
+    merged = dict(report)
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            old = json.load(f)
+        measured = {(r['name'], r['size']) for r in report['results']}
+        merged['results'] = [r for r in old.get('results', []) if (r['name'], r['size']) not in measured]
+        merged['results'] += report['results']
+        merged['results'].sort(key=lambda r: (list(CASES).index(r['name']) if r['name'] in CASES else len(CASES),
+                                              r['size']))
+        seen = {(r['name'], r['size']) for r in merged['results']}
+        merged['skipped'] = []
+        for item in old.get('skipped', []) + report['skipped']:
+            if (item['name'], item['size']) not in seen:
+                seen.add((item['name'], item['size']))
+                merged['skipped'].append(item)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(merged, f, ensure_ascii=False, indent=2)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Набір бенчмарків LinkedList, MapManager, MapPoint і GUI")
+    parser.add_argument("--sizes", type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument("--max-gui-size", type=int, default=10 ** 5)
+    parser.add_argument("--require-gui", action='store_true',
+                        help="завершитися з помилкою, якщо GUI-бенчмарки неможливо запустити (напр. без xvfb-run)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="мінімальний час одного заміру, с")
+    parser.add_argument("--seed", type=int, default=12345)
+    parser.add_argument("--only", nargs='+', default=None, help="префікси назв бенчмарків")
+    parser.add_argument("--output", default=None, help="файл JSON з результатами")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action='store_true')
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args(argv)
+
+    os.chdir(ROOT)
+    names = [n for n in CASES if args.only is None or any(n.startswith(p) for p in args.only)]
+    has_gui = any(n in GUI_CASES for n in names) and gui_available()
+    if args.require_gui and any(n in GUI_CASES for n in names) and not has_gui:
+        print("GUI-бенчмарки потребують дисплея; запустіть через xvfb-run", file=sys.stderr)
+        return 2
+
+    jobs = []
+    skipped = []
+    for name in names:
+        for size in args.sizes:
+            if name in GUI_CASES and (not has_gui or size > args.max_gui_size):
+                skipped.append({'name': name, 'size': size})
+            else:
+                jobs.append((name, size))
+    results = run_cases(jobs, args.repeat, args.seed, args.min_time)
+    for r in results:
+        print(f"{r['name']:38s} {r['size']:>8d}  {r['median_s']:10.4f} с  {r['per_op_us']:12.3f} мкс/оп",
+              file=sys.stderr)
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'system': platform.system(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'min_time': args.min_time,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+        'skipped': skipped,
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    else:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+
+    if args.save_baseline:
+        save_baseline(report, args.baseline)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = 0
+    measured = {(r['name'], r['size']) for r in results}
+    for ref in baseline.get('results', []):
+        if (ref['name'], ref['size']) not in measured and ref['name'] in names and ref['size'] in args.sizes:
+            print(f"{ref['name']:38s} {ref['size']:>8d}  ПРОПУЩЕНО", file=sys.stderr)
+            regressions += args.require_gui and ref['name'] in GUI_CASES
+    for r, ratio in compare(results, baseline):
+        if ratio is None:
+            continue
+        mark = "РЕГРЕСІЯ" if ratio > args.threshold else ""
+        regressions += ratio > args.threshold
+        print(f"{r['name']:38s} {r['size']:>8d}  x{ratio:6.2f} {mark}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
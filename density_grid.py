@@ -0,0 +1,70 @@
+from typing import Dict, Iterable, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from point import MapPoint, SURFACES
+
+
+class DensityGrid:
+    def __init__(self, rows: int = 180, cols: int = 360, points: Optional[Iterable[MapPoint]] = None):
+        if np is None:
+            raise ImportError("Для теплової карти потрібен пакет numpy")
+        if rows < 1 or cols < 1:
+            raise ValueError("Розміри сітки повинні бути додатними")
+        self.rows = rows
+        self.cols = cols
+        self.version = 0
+        self.clear()
+        if points is not None:
+            self.rebuild(points)
+
+    def clear(self) -> None:
+        self.counts = np.zeros((len(SURFACES), self.rows, self.cols), dtype=np.int32)
+        self._cell_of: Dict[int, int] = {}
+        self.version += 1
+
+    def _flat_index(self, lat, lon, surface):
+        row = np.clip(((90.0 - lat) / 180.0 * self.rows).astype(np.int64), 0, self.rows - 1)
+        col = np.clip(((lon + 180.0) / 360.0 * self.cols).astype(np.int64), 0, self.cols - 1)
+        return (surface * self.rows + row) * self.cols + col
+
+    def _point_index(self, point: MapPoint) -> int:
+        row = min(self.rows - 1, max(0, int((90.0 - point.signed_latitude) / 180.0 * self.rows)))
+        col = min(self.cols - 1, max(0, int((point.signed_longitude + 180.0) / 360.0 * self.cols)))
+        return (point.surface_code * self.rows + row) * self.cols + col
+
+    def rebuild(self, points: Iterable[MapPoint]) -> None:
+        pts = list(points)
+        n = len(pts)
+        self.rebuild_from_arrays(
+            np.fromiter((p.id for p in pts), dtype=np.int64, count=n),
+            np.fromiter((p.signed_latitude for p in pts), dtype=np.float64, count=n),
+            np.fromiter((p.signed_longitude for p in pts), dtype=np.float64, count=n),
+            np.fromiter((p.surface_code for p in pts), dtype=np.int64, count=n))
+
+    def rebuild_from_arrays(self, ids, lat, lon, surface) -> None:
+        flat = self._flat_index(np.asarray(lat), np.asarray(lon), np.asarray(surface, dtype=np.int64))
+        self.counts = np.bincount(flat, minlength=self.counts.size).astype(np.int32).reshape(self.counts.shape)
+        self._cell_of = dict(zip(np.asarray(ids).tolist(), flat.tolist()))
+        self.version += 1
+
+    def add(self, point: MapPoint) -> None:
+        idx = self._point_index(point)
+        self.counts.flat[idx] += 1
+        self._cell_of[point.id] = idx
+        self.version += 1
+
+    def remove(self, point: MapPoint) -> None:
+        idx = self._cell_of.pop(point.id)
+        self.counts.flat[idx] -= 1
+        self.version += 1
+
+    def update(self, point: MapPoint) -> None:
+        self.remove(point)
+        self.add(point)
+
+    def totals(self):
+        return self.counts.sum(axis=0)
@@ -0,0 +1,108 @@
+import math
+from typing import Iterable, Iterator, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from point import MapPoint
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+DENSE_LIMIT = 4096
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("Для векторних обчислень відстаней потрібен пакет numpy")
+
+
+def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2 +
+         math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def point_distance(a: MapPoint, b: MapPoint) -> float:
+    return haversine(a.signed_latitude, a.signed_longitude, b.signed_latitude, b.signed_longitude)
+
+
+def coordinate_arrays(points: Iterable[MapPoint]):
+    _require_numpy()
+    pts = points if isinstance(points, list) else list(points)
+    lat = np.fromiter((p.signed_latitude for p in pts), dtype=np.float64, count=len(pts))
+    lon = np.fromiter((p.signed_longitude for p in pts), dtype=np.float64, count=len(pts))
+    return pts, lat, lon
+
+
+def haversine_to_many(lat: float, lon: float, lats, lons):
+    _require_numpy()
+    phi = math.radians(lat)
+    phis = np.radians(lats)
+    a = (np.sin((phis - phi) / 2) ** 2 +
+         math.cos(phi) * np.cos(phis) * np.sin(np.radians(lons - lon) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def _block(phi_a, lam_a, cos_a, phi_b, lam_b, cos_b):
+    d = np.subtract.outer(phi_a, phi_b)
+    d *= 0.5
+    np.sin(d, out=d)
+    d *= d
+    e = np.subtract.outer(lam_a, lam_b)
+    e *= 0.5
+    np.sin(e, out=e)
+    e *= e
+    e *= cos_a[:, None]
+    e *= cos_b[None, :]
+    d += e
+    np.minimum(d, 1.0, out=d)
+    np.sqrt(d, out=d)
+    np.arcsin(d, out=d)
+    d *= 2 * EARTH_RADIUS_KM
+    return d
+
+
+def iter_pairwise_blocks(lats, lons, block_size: int = 1024,
+                         upper: bool = False) -> Iterator[Tuple[int, int, object]]:
+    _require_numpy()
+    if block_size < 1:
+        raise ValueError("Розмір блоку повинен бути додатним")
+    phi = np.radians(np.asarray(lats, dtype=np.float64))
+    lam = np.radians(np.asarray(lons, dtype=np.float64))
+    cos = np.cos(phi)
+    n = len(phi)
+    for i in range(0, n, block_size):
+        ri = slice(i, i + block_size)
+        for j in range(i if upper else 0, n, block_size):
+            rj = slice(j, j + block_size)
+            yield i, j, _block(phi[ri], lam[ri], cos[ri], phi[rj], lam[rj], cos[rj])
+
+
+def pairwise_matrix(lats, lons):
+    _require_numpy()
+    if len(lats) > DENSE_LIMIT:
+        raise ValueError(f"Повна матриця відстаней доступна лише до {DENSE_LIMIT} точок; використовуйте блоки")
+    phi = np.radians(np.asarray(lats, dtype=np.float64))
+    lam = np.radians(np.asarray(lons, dtype=np.float64))
+    cos = np.cos(phi)
+    return _block(phi, lam, cos, phi, lam, cos)
+
+
+def radius_bbox(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    dlat = radius_km / KM_PER_DEGREE
+    min_lat = max(-90.0, lat - dlat)
+    max_lat = min(90.0, lat + dlat)
+    if abs(lat) + dlat >= 90.0:
+        return min_lat, -180.0, max_lat, 180.0
+    dlon = math.degrees(math.asin(min(1.0, math.sin(math.radians(dlat)) / math.cos(math.radians(lat)))))
+    min_lon = lon - dlon
+    max_lon = lon + dlon
+    if min_lon < -180.0:
+        min_lon += 360.0
+    if max_lon > 180.0:
+        max_lon -= 360.0
+    return min_lat, min_lon, max_lat, max_lon
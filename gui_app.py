@@ -1,61 +1,240 @@
-import os
+import functools
+import math
+import warnings
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
 
-from map_manager import MapManager, MAX_POINTS
-from point import MapPoint
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from geo import point_distance
+from hit_index import ScreenHitIndex
+from profiling import ENABLED as PROFILING, counters_snapshot, profiler, timed
+from map_manager import MapManager, CapacityWarning
+from query import And, Contains, Eq, Or, Range
+from task_runner import TaskRunner
+from point import MapPoint, SURFACES
 
 
 class FilterDialog(simpledialog.Dialog):
     CRITERIA_MAP = {
         "Поверхня": "surface",
         "Півкуля широти": "hem_lat",
-        "Півкуля довготи": "hem_lon"
+        "Півкуля довготи": "hem_lon",
+        "Широта (від..до)": "lat",
+        "Довгота (від..до)": "lon",
+        "Назва містить": "location",
+    }
+    VALUE_CHOICES = {
+        "surface": ["материк", "острів", "океан", "озеро"],
+        "hem_lat": ["N", "S"],
+        "hem_lon": ["E", "W"],
     }
+    COMBINE_MAP = {
+        "Усі умови (І)": And,
+        "Будь-яка умова (АБО)": Or,
+    }
+    MAX_ROWS = 6
 
     def body(self, master):
         self._body_master = master
+        self._rows = []
 
-        ttk.Label(master, text="Критерій:").grid(row=0, column=0, sticky="w")
-        self.criteria = ttk.Combobox(master, values=list(self.CRITERIA_MAP.keys()), state="readonly")
-        self.criteria.current(0)
-        self.criteria.grid(row=0, column=1, pady=5, padx=5)
-        self.criteria.bind("<<ComboboxSelected>>", self._on_criteria_change)
-
-        ttk.Label(master, text="Значення:").grid(row=1, column=0, sticky="w")
-        self.value_widget = ttk.Combobox(master, values=["материк", "острів", "океан", "озеро"], state="readonly")
-        self.value_widget.current(0)
-        self.value_widget.grid(row=1, column=1, pady=5, padx=5)
-        return self.criteria
+        ttk.Label(master, text="Поєднання:").grid(row=0, column=0, sticky="w")
+        self.combine = ttk.Combobox(master, values=list(self.COMBINE_MAP.keys()), state="readonly")
+        self.combine.current(0)
+        self.combine.grid(row=0, column=1, pady=5, padx=5)
 
-    def _on_criteria_change(self, event=None):
-        crit_human = self.criteria.get()
-        crit = self.CRITERIA_MAP[crit_human]
+        self.add_button = ttk.Button(master, text="Додати умову", command=self._add_row)
+        self._add_row()
+        return self._rows[0][0]
 
+    def _add_row(self):
+        if len(self._rows) >= self.MAX_ROWS:
+            return
+        row = len(self._rows) + 1
+        criteria = ttk.Combobox(self._body_master, values=list(self.CRITERIA_MAP.keys()), state="readonly")
+        criteria.current(0)
+        criteria.grid(row=row, column=0, pady=5, padx=5)
+        value_widget = self._make_value_widget("surface")
+        value_widget.grid(row=row, column=1, pady=5, padx=5)
+        self._rows.append([criteria, value_widget])
+        criteria.bind("<<ComboboxSelected>>", lambda e, idx=len(self._rows) - 1: self._on_criteria_change(idx))
+        self.add_button.grid(row=self.MAX_ROWS + 1, column=0, columnspan=2, pady=5)
+
+    def _make_value_widget(self, crit):
+        choices = self.VALUE_CHOICES.get(crit)
+        if choices is None:
+            return ttk.Entry(self._body_master)
+        widget = ttk.Combobox(self._body_master, values=choices, state="readonly")
+        widget.current(0)
+        return widget
+
+    def _on_criteria_change(self, idx):
+        criteria, value_widget = self._rows[idx]
         try:
-            self.value_widget.destroy()
+            value_widget.destroy()
         except Exception:
             pass
+        value_widget = self._make_value_widget(self.CRITERIA_MAP[criteria.get()])
+        value_widget.grid(row=idx + 1, column=1, pady=5, padx=5)
+        self._rows[idx][1] = value_widget
+
+    def _build_condition(self, crit, value):
+        if crit in ("lat", "lon"):
+            low, sep, high = value.partition("..")
+            if not sep:
+                raise ValueError("Діапазон вводиться як «від..до», наприклад -10..45")
+            try:
+                return Range(crit, float(low), float(high))
+            except ValueError:
+                raise ValueError("Межі діапазону повинні бути числами")
+        if crit == "location":
+            return Contains(value)
+        return Eq(crit, value)
 
-        parent = self._body_master
-        if crit == "surface":
-            self.value_widget = ttk.Combobox(parent, values=["материк", "острів", "океан", "озеро"], state="readonly")
-        elif crit == "hem_lat":
-            self.value_widget = ttk.Combobox(parent, values=["N", "S"], state="readonly")
-        elif crit == "hem_lon":
-            self.value_widget = ttk.Combobox(parent, values=["E", "W"], state="readonly")
-        else:
-            self.value_widget = ttk.Entry(parent)
-        self.value_widget.grid(row=1, column=1, pady=5, padx=5)
+    def validate(self):
+        conditions = []
+        try:
+            for criteria, value_widget in self._rows:
+                value = value_widget.get().strip()
+                if not value:
+                    raise ValueError("Значення фільтра не введене.")
+                conditions.append(self._build_condition(self.CRITERIA_MAP[criteria.get()], value))
+        except ValueError as e:
+            messagebox.showwarning("Фільтр", str(e), parent=self)
+            return 0
+        combine = self.COMBINE_MAP[self.combine.get()]
+        self._query = conditions[0] if len(conditions) == 1 else combine(*conditions)
+        return 1
 
     def apply(self):
-        crit_human = self.criteria.get()
-        crit_machine = self.CRITERIA_MAP[crit_human]
-        value = self.value_widget.get().strip()
-        self.result = (crit_machine, value)
+        self.result = self._query
+
+
+class LocationDialog(simpledialog.Dialog):
+    SUGGESTION_LIMIT = 12
+
+    def __init__(self, parent, title, prompt, initialvalue=""):
+        self.prompt = prompt
+        self.initialvalue = initialvalue
+        self.catalog = MapPoint.get_location_catalog()
+        super().__init__(parent, title)
+
+    def body(self, master):
+        ttk.Label(master, text=self.prompt).pack(anchor=tk.W)
+        self.var = tk.StringVar(master, value=self.initialvalue)
+        self.entry = ttk.Entry(master, textvariable=self.var, width=40)
+        self.entry.pack(fill=tk.X, pady=(4, 4))
+        self.listbox = tk.Listbox(master, height=8, activestyle="dotbox")
+        self.listbox.pack(fill=tk.BOTH, expand=True)
+        self.var.trace_add("write", lambda *args: self._refresh())
+        self.entry.bind("<Down>", self._focus_list)
+        self.listbox.bind("<Double-Button-1>", self._pick)
+        self.listbox.bind("<Return>", self._pick)
+        self._refresh()
+        return self.entry
+
+    def _refresh(self):
+        self.listbox.delete(0, tk.END)
+        text = self.var.get()
+        if text.strip():
+            for name in self.catalog.suggest(text, self.SUGGESTION_LIMIT):
+                self.listbox.insert(tk.END, name)
+
+    def _focus_list(self, event):
+        if self.listbox.size():
+            self.listbox.focus_set()
+            self.listbox.selection_set(0)
+            self.listbox.activate(0)
+        return "break"
+
+    def _pick(self, event):
+        sel = self.listbox.curselection()
+        if sel:
+            self.var.set(self.listbox.get(sel[0]))
+        self.ok()
+        return "break"
+
+    def apply(self):
+        self.result = self.var.get()
+
+
+def ask_location(parent, title, prompt, initialvalue=""):
+    return LocationDialog(parent, title, prompt, initialvalue).result
+
+
+class DiagnosticsWindow(tk.Toplevel):
+    COLUMNS = ("name", "count", "total", "p50", "p95", "max")
+    HEADINGS = ("Метрика", "Кількість", "Сума, мс", "p50, мс", "p95, мс", "Макс, мс")
+    REFRESH_MS = 1000
+
+    def __init__(self, master):
+        super().__init__(master)
+        self.title("Діагностика")
+        self.geometry("720x380")
+        self.tree = ttk.Treeview(self, columns=self.COLUMNS, show="headings")
+        for col, heading in zip(self.COLUMNS, self.HEADINGS):
+            self.tree.heading(col, text=heading)
+            self.tree.column(col, width=90 if col != "name" else 260, anchor=tk.E if col != "name" else tk.W)
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)
+        buttons = ttk.Frame(self)
+        buttons.pack(fill=tk.X, padx=8, pady=(0, 8))
+        ttk.Button(buttons, text="Скинути", command=self.reset).pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Експорт JSON...", command=self.export).pack(side=tk.LEFT, padx=6)
+        ttk.Button(buttons, text="Закрити", command=self.destroy).pack(side=tk.RIGHT)
+        self.refresh()
+
+    def _extra_counters(self):
+        info = MapPoint.get_surface_classifier().cache_info()
+        return {"surface_classifier.cache_hits": info.hits, "surface_classifier.cache_misses": info.misses}
+
+    def refresh(self):
+        if not self.winfo_exists():
+            return
+        self.tree.delete(*self.tree.get_children())
+        for name, count, total, p50, p95, peak in counters_snapshot(self._extra_counters()):
+            ms = ["" if v is None else f"{v * 1000:.3f}" for v in (total, p50, p95, peak)]
+            self.tree.insert("", tk.END, values=(name, count, *ms))
+        self.after(self.REFRESH_MS, self.refresh)
+
+    def reset(self):
+        profiler.reset()
+        MapPoint.get_surface_classifier().cache_clear()
+        self.tree.delete(*self.tree.get_children())
+
+    def export(self):
+        path = filedialog.asksaveasfilename(parent=self, title="Експорт діагностики", defaultextension=".json",
+                                            filetypes=[("JSON", "*.json")])
+        if not path:
+            return
+        try:
+            profiler.export_json(path, self._extra_counters())
+        except OSError as e:
+            messagebox.showerror("Помилка", str(e), parent=self)
+
+
+def _when_idle(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._tasks.busy:
+            self.bell()
+            self.status_bar.config(text=f"Зачекайте: {self._tasks.current.title}...")
+            return None
+        return method(self, *args, **kwargs)
+    return wrapper
 
 
 class App(tk.Tk):
+    LOD_CELL_PX = 20
+    HIT_RADIUS_PX = 10
+    LABEL_LIMIT = 300
+    COMPACT_CHECK_MS = 30000
+    TREE_CHUNK = 2000
+    TREE_SYNC_LIMIT = 20000
+
     def __init__(self):
         super().__init__()
         self.title("Курсова робота: Точки на мапі")
@@ -65,17 +244,37 @@ class App(tk.Tk):
         self._setup_styles()
 
         self.manager = MapManager()
-        self._tag_to_point = {}
-        self._hover_tag = None
+        self._hover_point_id = None
+        self._hit_index = ScreenHitIndex()
+        self._hit_index_key = None
+        self._map_version = 0
+        self._drawn_markers = {}
+        self._sprite_cache = {}
+        self._lod_enabled = tk.BooleanVar(self, value=True)
+        self._map_mode = tk.StringVar(self, value="points")
+        self._heatmap_image = None
+        self._heatmap_key = None
+        self._static_size = None
+        self._redraw_job = None
+        self._diagnostics = None
+        self._active_filter = None
+        self._route_ids = []
+        self._tasks = TaskRunner(self, self._on_task_progress, self._on_task_finish)
+        self._redraw_after_task = False
+        self._deferred_list_update = None
+        self._resync = None
         self._is_reversed = False
 
-        if not os.path.exists('locations.txt'):
+        if MapPoint.get_location_catalog().missing:
             messagebox.showwarning("Увага",
                                    "Файл 'locations.txt' не знайдено. Будуть використовуватись підстановки для назв місць.")
 
-        self._listbox_ids = []
         self._tree_iid_to_point_id = {}
         self._tree_order_iids = []
+        self._tree_order_set = set()
+        self._tree_values = {}
+        self._tree_shown_order = {}
+        self._order_refresh_pending = False
         self.create_widgets()
         self.update_points_list()
 
@@ -84,6 +283,8 @@ class App(tk.Tk):
         self.bind('<Delete>', lambda e: self._trigger_delete_selected())
         self.bind('<Insert>', lambda e: self.add_point())
         self.bind('<Control-s>', lambda e: self.sort_points())
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.after(self.COMPACT_CHECK_MS, self._periodic_compaction)
 
     def _setup_styles(self):
         style = ttk.Style(self)
@@ -104,7 +305,12 @@ class App(tk.Tk):
     def create_widgets(self):
         menubar = tk.Menu(self)
         filemenu = tk.Menu(menubar, tearoff=0)
-        filemenu.add_command(label="Вихід", command=self.quit)
+        filemenu.add_command(label="Відкрити...", command=self.open_snapshot)
+        filemenu.add_command(label="Зберегти...", command=self.save_snapshot)
+        filemenu.add_separator()
+        filemenu.add_command(label="Імпорт точок...", command=self.import_points)
+        filemenu.add_separator()
+        filemenu.add_command(label="Вихід", command=self._on_close)
         menubar.add_cascade(label="Файл", menu=filemenu)
 
         actionmenu = tk.Menu(menubar, tearoff=0)
@@ -113,11 +319,22 @@ class App(tk.Tk):
         actionmenu.add_command(label="Редагувати вибрану...", command=self.edit_selected)
         actionmenu.add_command(label="Видалити вибрану", command=self.remove_selected)
         actionmenu.add_command(label="Сортувати за місцем", command=self.sort_points)
+        actionmenu.add_command(label="Упорядкування...", command=self.configure_sort_order)
         actionmenu.add_command(label="Фільтрувати", command=self.filter_points)
+        actionmenu.add_command(label="Побудувати маршрут", command=self.build_route)
+        actionmenu.add_command(label="Сховати маршрут", command=self.hide_route)
+        actionmenu.add_command(label="Ліміт точок...", command=self.configure_capacity)
 
         actionmenu.add_separator()
         actionmenu.add_command(label="Показати зворотно", command=self.show_reverse)
         actionmenu.add_command(label="Показати по №", command=self.show_point_by_order)
+        actionmenu.add_separator()
+        actionmenu.add_checkbutton(label="Групувати близькі точки", variable=self._lod_enabled,
+                                   command=self.draw_map)
+        actionmenu.add_radiobutton(label="Карта: окремі точки", value="points", variable=self._map_mode,
+                                   command=self.set_map_mode)
+        actionmenu.add_radiobutton(label="Карта: теплова карта щільності", value="heatmap",
+                                   variable=self._map_mode, command=self.set_map_mode)
         menubar.add_cascade(label="Дії", menu=actionmenu)
 
         self.config(menu=menubar)
@@ -152,7 +369,8 @@ class App(tk.Tk):
 
         scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.points_tree.yview)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.points_tree.configure(yscrollcommand=scrollbar.set)
+        self.points_tree.configure(yscrollcommand=lambda first, last: self._on_tree_scroll(scrollbar, first, last))
+        self.points_tree.bind("<Configure>", lambda e: self._schedule_order_refresh())
 
         right_frame = ttk.Frame(main_frame)
         right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=False)
@@ -188,39 +406,107 @@ class App(tk.Tk):
         ttk.Label(legend_frame, text="● Океан", foreground="#1565c0").pack(side=tk.LEFT, padx=4)
         ttk.Label(legend_frame, text="● Озеро", foreground="#00838f").pack(side=tk.LEFT, padx=4)
 
-        self.status_bar = ttk.Label(self, text="", anchor=tk.W)
-        self.status_bar.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=5)
+        status_frame = ttk.Frame(self)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=5)
+        if PROFILING:
+            ttk.Button(status_frame, text="Діагностика", command=self.show_diagnostics).pack(side=tk.RIGHT)
+        self.cancel_button = ttk.Button(status_frame, text="Скасувати", command=self._tasks.cancel)
+        self.progress_bar = ttk.Progressbar(status_frame, length=160, mode="determinate")
+        self.status_bar = ttk.Label(status_frame, text="", anchor=tk.W)
+        self.status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
 
-        self.map_canvas.bind("<Configure>", lambda e: self.draw_map())
+        self.map_canvas.bind("<Configure>", lambda e: self._schedule_map_redraw())
         self.map_canvas.bind("<Motion>", self._on_canvas_motion)
         self.map_canvas.bind("<Leave>", lambda e: self._clear_hover())
         self.map_canvas.bind("<Button-1>", self._on_canvas_click)
 
+    @timed('App.update_points_list')
     def update_points_list(self, points_to_display=None):
-        for iid in self.points_tree.get_children():
-            self.points_tree.delete(iid)
-        self._tree_iid_to_point_id.clear()
-        self._tree_order_iids.clear()
-
         if points_to_display is None:
-            pts = self.manager.get_all_points_list()
-            if self._is_reversed:
-                pts = list(reversed(pts))
-            mode_full = True
+            self._active_filter = None
+        if self._tasks.busy:
+            self._deferred_list_update = (points_to_display,)
+            return
+        if points_to_display is None:
+            total = self.manager.get_active_count()
         else:
-            pts = list(points_to_display)
-            mode_full = False
+            total = len(points_to_display)
+        if max(total, len(self._tree_values)) <= self.TREE_SYNC_LIMIT:
+            for _ in self._tree_update_steps(*self._collect_tree_rows(points_to_display)):
+                pass
+            self._after_points_update()
+            return
+        self._run_task("Підготовка списку", lambda task: self._collect_tree_rows(points_to_display, task, total),
+                       lambda rows: self._apply_tree_rows(rows, points_to_display), resync=(points_to_display,))
 
-        for idx, p in enumerate(pts, start=1):
-            iid = f"row-{p.id}"
-            values = (idx, p.id, p.location_name, p.surface)
-            self.points_tree.insert("", tk.END, iid=iid, values=values)
-            self._tree_iid_to_point_id[iid] = p.id
-            self._tree_order_iids.append(iid)
+    def _apply_tree_rows(self, rows, points_to_display=None):
+        task = self._tasks.submit_steps("Оновлення списку", self._tree_update_steps(*rows),
+                                        on_done=lambda _: self._after_points_update(),
+                                        on_error=self._show_task_error)
+        self._resync = (task, (points_to_display,))
 
+    def _collect_tree_rows(self, points_to_display=None, task=None, total=0):
+        if points_to_display is None:
+            pts = self.manager.get_all_points()
+            pts = reversed(pts) if self._is_reversed else pts
+        else:
+            pts = points_to_display
+        new_order = []
+        new_values = {}
+        for n, p in enumerate(pts):
+            if task is not None and n % 65536 == 0:
+                task.progress(n, total)
+            iid = f"row-{p.id}"
+            new_order.append(iid)
+            new_values[iid] = (p.id, p.location_name, p.surface)
+        return new_order, new_values
+
+    def _tree_update_steps(self, new_order, new_values):
+        tree = self.points_tree
+        chunk = self.TREE_CHUNK
+        stale = [iid for iid in self._tree_values if iid not in new_values]
+        items = list(new_values.items())
+        total = len(stale) + len(items)
+        if stale and PROFILING:
+            profiler.count('treeview.rows_deleted', len(stale))
+        for start in range(0, len(stale), chunk):
+            part = stale[start:start + chunk]
+            tree.delete(*part)
+            for iid in part:
+                del self._tree_values[iid]
+                self._tree_iid_to_point_id.pop(iid, None)
+                self._tree_shown_order.pop(iid, None)
+            yield start + len(part), total, "видалення рядків"
+
+        for start in range(0, len(items), chunk):
+            for iid, values in items[start:start + chunk]:
+                old = self._tree_values.get(iid)
+                if old is None:
+                    tree.insert("", tk.END, iid=iid, values=("",) + values)
+                elif old != values:
+                    tree.item(iid, values=(self._tree_shown_order.get(iid, ""),) + values)
+                else:
+                    continue
+                if PROFILING:
+                    profiler.count('treeview.rows_written')
+                self._tree_values[iid] = values
+                self._tree_iid_to_point_id[iid] = values[0]
+            yield len(stale) + min(len(items), start + chunk), total, "оновлення рядків"
+
+        current_order = [iid for iid in self._tree_order_iids if iid in new_values]
+        current_order.extend(iid for iid in new_order if iid not in self._tree_order_set)
+        if current_order != new_order:
+            if PROFILING:
+                profiler.count('treeview.reorders')
+            tree.set_children("", *new_order)
+        self._tree_order_iids = new_order
+        self._tree_order_set = set(new_order)
+        self._schedule_order_refresh()
+
+    def _after_points_update(self):
         total_created = MapPoint.get_instance_count()
         total_active = self.manager.get_active_count()
-        land_perc = MapPoint.get_land_percentage_from_list(self.manager.get_all_points_list())
+        land_perc = self.manager.get_land_percentage()
         self.status_bar.config(
             text=f"Всього створено: {total_created} | В списку: {total_active} | На суші: {land_perc:.2f}%")
 
@@ -228,22 +514,208 @@ class App(tk.Tk):
 
         self.draw_map()
 
+    def _on_task_progress(self, task, done, total, text):
+        if not self.cancel_button.winfo_manager():
+            self.cancel_button.pack(side=tk.RIGHT, padx=(6, 0))
+        if not self.progress_bar.winfo_manager():
+            self.progress_bar.pack(side=tk.RIGHT)
+        self.progress_bar.config(maximum=max(1, total), value=done)
+        suffix = f" ({text})" if text else ""
+        self.status_bar.config(text=f"{task.title}{suffix}: {done} / {total}")
+
+    def _on_task_finish(self, task, kind):
+        self.progress_bar.pack_forget()
+        self.cancel_button.pack_forget()
+        self.config(cursor="")
+        if kind == 'cancelled':
+            self.status_bar.config(text=f"{task.title}: скасовано")
+        if self._resync is not None and self._resync[0] is task:
+            _, args = self._resync
+            self._resync = None
+            if kind == 'error' and task.fn is None:
+                self._reset_tree()
+            if kind != 'done' and self._deferred_list_update is None:
+                self._deferred_list_update = args
+        if self._deferred_list_update is not None:
+            args, self._deferred_list_update = self._deferred_list_update, None
+            self.after_idle(self.update_points_list, *args)
+        elif self._redraw_after_task:
+            self.after_idle(self.draw_map)
+        self._redraw_after_task = False
+
+    def _reset_tree(self):
+        self.points_tree.delete(*self.points_tree.get_children())
+        self._tree_iid_to_point_id = {}
+        self._tree_order_iids = []
+        self._tree_order_set = set()
+        self._tree_values = {}
+        self._tree_shown_order = {}
+
+    def _run_task(self, title, fn, on_done, on_error=None, resync=None):
+        self.config(cursor="watch")
+        self.status_bar.config(text=f"{title}...")
+        if not self.cancel_button.winfo_manager():
+            self.cancel_button.pack(side=tk.RIGHT, padx=(6, 0))
+        task = self._tasks.submit(title, fn, on_done, on_error or self._show_task_error)
+        if resync is not None:
+            self._resync = (task, resync)
+        return task
+
+    def _show_task_error(self, error):
+        messagebox.showerror("Помилка", str(error))
+
+    def _on_tree_scroll(self, scrollbar, first, last):
+        scrollbar.set(first, last)
+        self._schedule_order_refresh()
+
+    def _schedule_order_refresh(self):
+        if not self._order_refresh_pending:
+            self._order_refresh_pending = True
+            self.after_idle(self._refresh_visible_order)
+
+    def _refresh_visible_order(self):
+        self._order_refresh_pending = False
+        size = len(self._tree_order_iids)
+        if size == 0:
+            return
+        first, last = self.points_tree.yview()
+        start = max(0, int(first * size) - 1)
+        end = min(size, int(last * size) + 2)
+        for idx in range(start, end):
+            iid = self._tree_order_iids[idx]
+            if iid in self._tree_values and self._tree_shown_order.get(iid) != idx + 1:
+                self.points_tree.set(iid, "order", idx + 1)
+                self._tree_shown_order[iid] = idx + 1
+
+    @staticmethod
+    def _capture_capacity_warning(func, *args, **kwargs):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", CapacityWarning)
+            result = func(*args, **kwargs)
+        messages = [str(w.message) for w in caught if issubclass(w.category, CapacityWarning)]
+        return result, messages[0] if messages else None
+
+    def _call_with_capacity_warning(self, func, *args):
+        result, message = self._capture_capacity_warning(func, *args)
+        if message:
+            messagebox.showwarning("Ліміт", message)
+        return result
+
+    @_when_idle
+    def configure_capacity(self):
+        current = self.manager.max_points or 0
+        limit = simpledialog.askinteger("Ліміт точок", "Введіть ліміт точок (0 — без ліміту):",
+                                        initialvalue=current, minvalue=0)
+        if limit is None:
+            return
+        if limit == 0:
+            self.manager.set_capacity(None, 'unlimited')
+            messagebox.showinfo("Ліміт", "Ліміт точок вимкнено.")
+            return
+        hard = messagebox.askyesno("Ліміт", "Заборонити перевищення ліміту?\n"
+                                            "(Ні — лише попереджати про перевищення)")
+        self.manager.set_capacity(limit, 'hard' if hard else 'soft')
+        messagebox.showinfo("Ліміт", f"Ліміт точок: {limit} ({'суворий' if hard else 'м’який'}).")
+
+    @_when_idle
     def generate_points(self):
-        num = simpledialog.askinteger("Створення набору", f"Введіть кількість точок (1-{MAX_POINTS}):", minvalue=1,
-                                      maxvalue=MAX_POINTS)
+        if self.manager.capacity_mode == 'hard':
+            num = simpledialog.askinteger("Створення набору",
+                                          f"Введіть кількість точок (1-{self.manager.max_points}):",
+                                          minvalue=1, maxvalue=self.manager.max_points)
+        else:
+            num = simpledialog.askinteger("Створення набору", "Введіть кількість точок:", minvalue=1)
         if num is None:
             return
-        created = self.manager.fill_random_points(num, reset_ids=True)
-        messagebox.showinfo("Успіх", f"Створено {created} випадкових точок.")
-        self.update_points_list()
 
+        def done(outcome):
+            created, message = outcome
+            if message:
+                messagebox.showwarning("Ліміт", message)
+            self.update_points_list()
+            messagebox.showinfo("Успіх", f"Створено {created} випадкових точок.")
+
+        self._run_task("Створення набору",
+                       lambda task: self._capture_capacity_warning(self.manager.fill_random_points, num, True,
+                                                                   progress=task.progress),
+                       done)
+
+    @_when_idle
+    def import_points(self):
+        path = filedialog.askopenfilename(title="Імпорт точок",
+                                          filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl *.ndjson"),
+                                                     ("Усі файли", "*.*")])
+        if not path:
+            return
+
+        def done(outcome):
+            report, message = outcome
+            if message:
+                messagebox.showwarning("Ліміт", message)
+            self.update_points_list()
+            summary = str(report).splitlines()
+            if len(summary) > 11:
+                summary = summary[:11] + [f"  ... (усього відхилено: {report.rejected})"]
+            messagebox.showinfo("Імпорт", "\n".join(summary))
+
+        self._run_task("Імпорт точок",
+                       lambda task: self._capture_capacity_warning(self.manager.import_file, path,
+                                                                   progress=task.progress),
+                       done, resync=(None,))
+
+    @_when_idle
+    def open_snapshot(self):
+        path = filedialog.askopenfilename(title="Відкрити знімок",
+                                          filetypes=[("Знімок карти", "*.kmap"), ("Усі файли", "*.*")])
+        if not path:
+            return
+        self._run_task("Відкриття знімка", lambda task: self.manager.open_journal(path, progress=task.progress),
+                       lambda replayed: self.update_points_list(), resync=(None,))
+
+    @_when_idle
+    def save_snapshot(self):
+        path = filedialog.asksaveasfilename(title="Зберегти знімок", defaultextension=".kmap",
+                                            filetypes=[("Знімок карти", "*.kmap"), ("Усі файли", "*.*")])
+        if not path:
+            return
+
+        def save(task):
+            count = self.manager.save(path, progress=task.progress)
+            self.manager.open_journal(path, replay=False)
+            return count
+
+        self._run_task("Збереження знімка", save,
+                       lambda count: messagebox.showinfo("Збереження", f"Збережено точок: {count}"))
+
+    def show_diagnostics(self):
+        if self._diagnostics is not None and self._diagnostics.winfo_exists():
+            self._diagnostics.lift()
+            return
+        self._diagnostics = DiagnosticsWindow(self)
+
+    def _periodic_compaction(self):
+        if not self._tasks.busy and self.manager.needs_compaction():
+            self._run_task("Стиснення журналу", lambda task: self.manager.compact(progress=task.progress),
+                           lambda result: self.status_bar.config(text="Журнал стиснуто"),
+                           lambda error: self.status_bar.config(text=f"Не вдалося стиснути журнал: {error}"))
+        self.after(self.COMPACT_CHECK_MS, self._periodic_compaction)
+
+    def _on_close(self):
+        self._tasks.shutdown()
+        try:
+            self.manager.close_journal()
+        except OSError as e:
+            messagebox.showerror("Помилка", f"Не вдалося записати журнал: {e}")
+        self.destroy()
+
+    @_when_idle
     def add_point(self):
-        if self.manager.get_active_count() >= MAX_POINTS:
-            messagebox.showwarning("Ліміт", f"Неможливо додати більше {MAX_POINTS} точок.")
+        if self.manager.capacity_left() == 0:
+            messagebox.showwarning("Ліміт", f"Неможливо додати більше {self.manager.max_points} точок.")
             return
 
         if messagebox.askyesno("Ручне введення", "Бажаєте ввести дані точки вручну?"):
-            loc = simpledialog.askstring("Місце", "Введіть назву місця:")
+            loc = ask_location(self, "Місце", "Введіть назву місця:")
             if loc is None:
                 messagebox.showwarning("Скасовано", "Назва не введена.")
                 return
@@ -266,20 +738,21 @@ class App(tk.Tk):
                 return
             manual = {'location': loc, 'lat': lat, 'lat_hem': lat_hem, 'lon': lon, 'lon_hem': lon_hem}
             try:
-                p = self.manager.add_point(manual)
+                p = self._call_with_capacity_warning(self.manager.add_point, manual)
             except ValueError as e:
                 messagebox.showerror("Помилка", str(e))
                 return
             messagebox.showinfo("Успіх", f"Додано точку (ID {p.id}).")
         else:
             try:
-                p = self.manager.add_point()
+                p = self._call_with_capacity_warning(self.manager.add_point)
             except ValueError as e:
                 messagebox.showerror("Помилка", str(e))
                 return
             messagebox.showinfo("Успіх", f"Додано нову випадкову точку (ID {p.id}).")
         self.update_points_list()
 
+    @_when_idle
     def remove_selected(self):
         sel = self.points_tree.selection()
         if not sel:
@@ -299,6 +772,7 @@ class App(tk.Tk):
                 messagebox.showerror("Помилка", f"Точку з ID {point_id} не знайдено.")
             self.update_points_list()
 
+    @_when_idle
     def edit_selected(self):
         sel = self.points_tree.selection()
         if not sel:
@@ -322,41 +796,91 @@ class App(tk.Tk):
         if None in (lat, lon, lat_hem, lon_hem):
             return
         try:
-            p.update_coordinates(lat, lat_hem.upper(), lon, lon_hem.upper())
+            self.manager.update_coordinates(point_id, lat, lat_hem.upper(), lon, lon_hem.upper())
             if messagebox.askyesno("Редагувати назву", "Бажаєте змінити назву місця?"):
-                newloc = simpledialog.askstring("Нова назва", "Введіть нову назву:", initialvalue=p.location_name)
+                newloc = ask_location(self, "Нова назва", "Введіть нову назву:", initialvalue=p.location_name)
                 if newloc:
-                    p.set_location_name(newloc)
+                    self.manager.set_location_name(point_id, newloc)
             messagebox.showinfo("Успіх", "Точка оновлена.")
             self.update_points_list()
         except ValueError as e:
             messagebox.showerror("Помилка", str(e))
 
+    @_when_idle
     def sort_points(self):
-        self.manager.sort_by_location_name()
+        def done(_):
+            self.update_points_list()
+            messagebox.showinfo("Успіх", "Список відсортовано за назвою місця.")
+
+        self._run_task("Сортування", lambda task: self.manager.sort_by_location_name(progress=task.progress), done)
+
+    @_when_idle
+    def configure_sort_order(self):
+        current = ", ".join(self.manager.sort_keys or ("location",))
+        text = simpledialog.askstring("Упорядкування",
+                                      "Ключі через кому: location, id, latitude, longitude, surface\n"
+                                      "(префікс '-' — за спаданням):", initialvalue=current)
+        if text is None:
+            return
+        persistent = messagebox.askyesno("Упорядкування", "Підтримувати цей порядок при додаванні та зміні точок?")
+        try:
+            self.manager.sort_by(text.split(","), persistent=persistent)
+        except ValueError as e:
+            messagebox.showerror("Помилка", str(e))
+            return
         self.update_points_list()
-        messagebox.showinfo("Успіх", "Список відсортовано за назвою місця.")
 
+    @_when_idle
     def filter_points(self):
         dlg = FilterDialog(self, title="Фільтр")
         if not getattr(dlg, 'result', None):
             return
-        key, val = dlg.result
-        if not val:
-            messagebox.showwarning("Пусто", "Значення фільтра не введене.")
-            return
-        results = self.manager.filter_by(key, val)
-        if not results:
-            messagebox.showinfo("Результат", "Точок за заданим фільтром не знайдено.")
+        predicate = dlg.result
+
+        def done(results):
+            if not results:
+                messagebox.showinfo("Результат", "Точок за заданим фільтром не знайдено.")
+                return
+            self.update_points_list(results)
+            self._active_filter = predicate
+
+        self._run_task("Фільтрація", lambda task: self.manager.query(predicate, progress=task.progress), done)
+
+    @_when_idle
+    def build_route(self):
+        predicate = self._active_filter
+        if (self.manager.query_count(predicate) if predicate is not None else self.manager.get_active_count()) < 2:
+            messagebox.showinfo("Маршрут", "Для маршруту потрібно щонайменше дві точки.")
             return
-        self.update_points_list(results)
 
+        def plan(task):
+            route = self.manager.plan_route(predicate)
+            return route, sum(point_distance(a, b) for a, b in zip(route, route[1:]))
+
+        def done(outcome):
+            route, length = outcome
+            self._route_ids = [p.id for p in route]
+            if predicate is not None:
+                self.update_points_list(route)
+                self._active_filter = predicate
+            else:
+                self.update_points_list()
+            messagebox.showinfo("Маршрут", f"Маршрут: {len(route)} точок, {length:.0f} км")
+
+        self._run_task("Побудова маршруту", plan, done)
+
+    def hide_route(self):
+        self._route_ids = []
+        self.map_canvas.delete("route")
+
+    @_when_idle
     def show_reverse(self):
         self._is_reversed = not self._is_reversed
         self.update_points_list()
         status_text = "Зворотний порядок" if self._is_reversed else "Нормальний порядок"
         messagebox.showinfo("Порядок списку", f": {status_text}")
 
+    @_when_idle
     def show_point_by_order(self):
         total = self.manager.get_active_count()
         if total == 0:
@@ -383,8 +907,8 @@ class App(tk.Tk):
         else:
             current_iid = sel[0]
             try:
-                cur_index = self._tree_order_iids.index(current_iid)
-            except ValueError:
+                cur_index = self.points_tree.index(current_iid)
+            except tk.TclError:
                 cur_index = 0
             idx = cur_index + delta
             idx = max(0, min(size - 1, idx))
@@ -403,16 +927,42 @@ class App(tk.Tk):
         y = (90.0 - lat_val) / 180.0 * height
         return x, y
 
-    def _draw_sphere(self, cx, cy, radius, base_color, tags=()):
+    def _sphere_sprite(self, base_color, radius):
+        key = (base_color, radius)
+        sprite = self._sprite_cache.get(key)
+        if sprite is not None:
+            return sprite
         shadow = self._darker(base_color, 0.35)
-        main_id = self.map_canvas.create_oval(cx - radius, cy - radius, cx + radius, cy + radius,
-                                              fill=base_color, outline=shadow, width=1.5, tags=tags)
+        highlight = self._lighter(base_color, 0.55)
         hl_radius = max(2, int(radius * 0.55))
-        highlight_color = self._lighter(base_color, 0.55)
-        highlight_id = self.map_canvas.create_oval(cx - hl_radius, cy - hl_radius,
-                                                   cx - hl_radius / 3, cy - hl_radius / 3,
-                                                   fill=highlight_color, outline="", tags=tags)
-        return highlight_id
+        hl_center = -2 * hl_radius / 3
+        hl_r = hl_radius / 3
+        size = 2 * radius + 1
+        sprite = tk.PhotoImage(width=size, height=size)
+        for row in range(size):
+            dy = row - radius
+            run_start = None
+            colors = []
+            for col in range(size):
+                dx = col - radius
+                d = math.hypot(dx, dy)
+                if d > radius + 0.25:
+                    continue
+                if run_start is None:
+                    run_start = col
+                if d > radius - 1.5:
+                    colors.append(shadow)
+                elif math.hypot(dx - hl_center, dy - hl_center) <= hl_r:
+                    colors.append(highlight)
+                else:
+                    colors.append(base_color)
+            if colors:
+                sprite.put("{" + " ".join(colors) + "}", to=(run_start, row))
+        self._sprite_cache[key] = sprite
+        return sprite
+
+    def _draw_sprite(self, cx, cy, radius, base_color, tags=()):
+        return self.map_canvas.create_image(cx, cy, image=self._sphere_sprite(base_color, int(radius)), tags=tags)
 
     def _hex_to_rgb(self, color):
         if color.startswith('#'):
@@ -439,92 +989,256 @@ class App(tk.Tk):
         b = int(b * (1 - factor))
         return self._rgb_to_hex((max(0, r), max(0, g), max(0, b)))
 
+    def _hit_test(self, x, y):
+        if self._tasks.busy:
+            return None
+        w, h = self._static_size or (0, 0)
+        if self._hit_index_key != (self._map_version, w, h):
+            to_canvas = self._latlon_to_canvas
+            self._hit_index.build(
+                to_canvas(p.latitude, p.latitude_hemisphere, p.longitude, p.longitude_hemisphere, w, h) + (p,)
+                for p in self.manager.get_all_points())
+            self._hit_index_key = (self._map_version, w, h)
+        return self._hit_index.find(x, y, radius=self.HIT_RADIUS_PX)
+
     def _clear_hover(self):
-        if self._hover_tag:
-            try:
-                for item in self.map_canvas.find_withtag(self._hover_tag):
-                    self.map_canvas.itemconfigure(item, width=1.5)
-            except Exception:
-                pass
-            self._hover_tag = None
+        if self._hover_point_id is None:
+            return
+        try:
+            self.map_canvas.delete("hover")
+        except tk.TclError:
+            pass
+        self._hover_point_id = None
 
     def _on_canvas_motion(self, event):
-        current = self.map_canvas.find_withtag("current")
-        if not current:
+        point = self._hit_test(event.x, event.y)
+        if point is None:
             self._clear_hover()
             return
-        tags = self.map_canvas.gettags(current[0])
-        point_tags = [t for t in tags if t.startswith("point-")]
-        if not point_tags:
-            self._clear_hover()
-            return
-        tag = point_tags[0]
-        if tag == self._hover_tag:
+        if point.id == self._hover_point_id:
             return
         self._clear_hover()
-        try:
-            for item in self.map_canvas.find_withtag(tag):
-                self.map_canvas.itemconfigure(item, width=3)
-        except Exception:
-            pass
-        self._hover_tag = tag
+        w, h = self._static_size
+        x, y = self._latlon_to_canvas(point.latitude, point.latitude_hemisphere, point.longitude,
+                                      point.longitude_hemisphere, w, h)
+        r = 11 if point.id in self._drawn_markers else 7
+        self.map_canvas.create_oval(x - r, y - r, x + r, y + r, outline="#ff6f00", width=2, tags=("hover",))
+        self._hover_point_id = point.id
 
     def _on_canvas_click(self, event):
-        clicked = self.map_canvas.find_withtag("current")
-        if not clicked:
-            return
-        tags = self.map_canvas.gettags(clicked[0])
-        tag = next((t for t in tags if t.startswith("point-")), None)
-        if not tag:
-            return
-        point = self._tag_to_point.get(tag)
-        if not point:
+        point = self._hit_test(event.x, event.y)
+        if point is None:
             return
+        iid = f"row-{point.id}"
+        if iid in self._tree_values:
+            self.points_tree.selection_set(iid)
+            self.points_tree.focus(iid)
+            self.points_tree.see(iid)
         info = f"ID: {point.id}\n{point}"
         messagebox.showinfo("Точка", info)
 
-    def draw_map(self):
-        try:
-            self.map_canvas.delete("all")
-        except Exception:
-            return
-        self._tag_to_point.clear()
-        w = int(self.map_canvas.winfo_width()) or 480
-        h = int(self.map_canvas.winfo_height()) or 480
+    def _schedule_map_redraw(self, delay=80):
+        if self._redraw_job is not None:
+            self.after_cancel(self._redraw_job)
+        self._redraw_job = self.after(delay, self._run_scheduled_redraw)
+
+    def _run_scheduled_redraw(self):
+        self._redraw_job = None
+        self.draw_map()
 
+    def _surface_color(self, surface):
+        if surface in ('материк', 'острів'):
+            return '#2e7d32'
+        if surface == 'океан':
+            return '#1565c0'
+        return '#00838f'
+
+    def _draw_static_layer(self, w, h):
+        self.map_canvas.delete("static")
         grid_color = "#e0e0e0"
         for lon_deg in range(-180, 181, 30):
             x = (lon_deg + 180) / 360 * w
             dash = () if lon_deg % 60 == 0 else (2, 3)
-            self.map_canvas.create_line(x, 0, x, h, fill=grid_color, dash=dash)
+            self.map_canvas.create_line(x, 0, x, h, fill=grid_color, dash=dash, tags=("static", "grid"))
         for lat_deg in range(-90, 91, 15):
             y = (90 - lat_deg) / 180 * h
             dash = () if lat_deg % 30 == 0 else (2, 3)
-            self.map_canvas.create_line(0, y, w, y, fill=grid_color, dash=dash)
-
-        for p in self.manager.get_all_points_list():
-            x, y = self._latlon_to_canvas(p.latitude, p.latitude_hemisphere, p.longitude, p.longitude_hemisphere, w, h)
-            r = 9
-            if p.surface in ('материк', 'острів'):
-                base = '#2e7d32'
-            elif p.surface == 'океан':
-                base = '#1565c0'
-            else:
-                base = '#00838f'
-            tag = f"point-{p.id}"
-            self._tag_to_point[tag] = p
-            self._draw_sphere(x, y, r, base, tags=("point", tag))
-            self.map_canvas.create_text(x + r + 3, y, text=str(p.id), anchor='w', font=("Arial", 8))
+            self.map_canvas.create_line(0, y, w, y, fill=grid_color, dash=dash, tags=("static", "grid"))
+        self.map_canvas.tag_lower("grid")
 
         lx, ly = 8, 8
-        self.map_canvas.create_rectangle(lx - 3, ly - 3, lx + 180, ly + 84, outline='', fill='#d0d0d0')
-        self.map_canvas.create_rectangle(lx - 4, ly - 4, lx + 176, ly + 80, outline='#bdbdbd', fill='#ffffff')
-        self.map_canvas.create_oval(lx + 6, ly + 10, lx + 18, ly + 22, fill='#2e7d32', outline='')
-        self.map_canvas.create_text(lx + 26, ly + 16, text="Суша (материк/острів)", anchor='w', font=("Arial", 8))
-        self.map_canvas.create_oval(lx + 6, ly + 28, lx + 18, ly + 40, fill='#1565c0', outline='')
-        self.map_canvas.create_text(lx + 26, ly + 34, text="Океан", anchor='w', font=("Arial", 8))
-        self.map_canvas.create_oval(lx + 6, ly + 46, lx + 18, ly + 58, fill='#00838f', outline='')
-        self.map_canvas.create_text(lx + 26, ly + 52, text="Озеро", anchor='w', font=("Arial", 8))
+        tags = ("static", "legend")
+        self.map_canvas.create_rectangle(lx - 3, ly - 3, lx + 180, ly + 84, outline='', fill='#d0d0d0', tags=tags)
+        self.map_canvas.create_rectangle(lx - 4, ly - 4, lx + 176, ly + 80, outline='#bdbdbd', fill='#ffffff',
+                                         tags=tags)
+        self.map_canvas.create_oval(lx + 6, ly + 10, lx + 18, ly + 22, fill='#2e7d32', outline='', tags=tags)
+        self.map_canvas.create_text(lx + 26, ly + 16, text="Суша (материк/острів)", anchor='w', font=("Arial", 8),
+                                    tags=tags)
+        self.map_canvas.create_oval(lx + 6, ly + 28, lx + 18, ly + 40, fill='#1565c0', outline='', tags=tags)
+        self.map_canvas.create_text(lx + 26, ly + 34, text="Океан", anchor='w', font=("Arial", 8), tags=tags)
+        self.map_canvas.create_oval(lx + 6, ly + 46, lx + 18, ly + 58, fill='#00838f', outline='', tags=tags)
+        self.map_canvas.create_text(lx + 26, ly + 52, text="Озеро", anchor='w', font=("Arial", 8), tags=tags)
+
+    def _erase_marker(self, key):
+        self._drawn_markers.pop(key, None)
+        if isinstance(key, tuple):
+            self.map_canvas.delete(f"cluster-{key[1]}-{key[2]}")
+            return
+        self.map_canvas.delete(f"point-{key}", f"label-{key}")
+        if self._hover_point_id == key:
+            self._clear_hover()
+
+    def _layout_markers(self, w, h):
+        kx = w / 360.0
+        ky = h / 180.0
+        if not self._lod_enabled.get():
+            markers = {}
+            for p in self.manager.get_all_points():
+                x = (p.signed_longitude + 180.0) * kx
+                y = (90.0 - p.signed_latitude) * ky
+                markers[p.id] = (('p', round(x, 1), round(y, 1), self._surface_color(p.surface)), p)
+            return markers
+
+        cell = self.LOD_CELL_PX
+        bins = {}
+        for p in self.manager.get_all_points():
+            x = (p.signed_longitude + 180.0) * kx
+            y = (90.0 - p.signed_latitude) * ky
+            key = (int(x // cell), int(y // cell))
+            b = bins.get(key)
+            if b is None:
+                b = bins[key] = [0, 0.0, 0.0, p, [0] * len(SURFACES)]
+            b[0] += 1
+            b[1] += x
+            b[2] += y
+            b[4][p.surface_code] += 1
+
+        markers = {}
+        for (i, j), (count, sx, sy, first, surfaces) in bins.items():
+            if count == 1:
+                markers[first.id] = (('p', round(sx, 1), round(sy, 1), self._surface_color(first.surface)), first)
+            else:
+                dominant = SURFACES[surfaces.index(max(surfaces))]
+                state = ('c', round(sx / count, 1), round(sy / count, 1), self._surface_color(dominant), count)
+                markers[('c', i, j)] = (state, None)
+        return markers
+
+    def _draw_cluster(self, key, cx, cy, color, count):
+        r = min(22, 9 + 6 * math.log10(count))
+        tags = ("cluster", f"cluster-{key[1]}-{key[2]}")
+        self._draw_sprite(cx, cy, r, color, tags=tags)
+        self.map_canvas.create_text(cx, cy, text=str(count), fill="#ffffff", font=("Arial", 8, "bold"), tags=tags)
+
+    def _sync_point_layer(self, w, h):
+        r = 9
+        markers = self._layout_markers(w, h)
+        for key in [k for k in self._drawn_markers if k not in markers]:
+            self._erase_marker(key)
+        labels = sum(1 for _, p in markers.values() if p is not None) <= self.LABEL_LIMIT
+        created = False
+        for key, (state, p) in markers.items():
+            if p is not None:
+                state = state + (labels,)
+            if self._drawn_markers.get(key) == state:
+                continue
+            if key in self._drawn_markers:
+                self._erase_marker(key)
+            if p is None:
+                self._draw_cluster(key, *state[1:])
+            else:
+                x, y = state[1], state[2]
+                self._draw_sprite(x, y, r, state[3], tags=("point", f"point-{p.id}"))
+                if labels:
+                    self.map_canvas.create_text(x + r + 3, y, text=str(p.id), anchor='w', font=("Arial", 8),
+                                                tags=("pointlabel", f"label-{p.id}"))
+            self._drawn_markers[key] = state
+            created = True
+        if created:
+            self.map_canvas.tag_raise("legend")
+
+    @timed('App.draw_map')
+    def draw_map(self):
+        if self._tasks.busy:
+            self._redraw_after_task = True
+            return
+        try:
+            w = int(self.map_canvas.winfo_width()) or 480
+            h = int(self.map_canvas.winfo_height()) or 480
+        except tk.TclError:
+            return
+        self._map_version += 1
+        if (w, h) != self._static_size:
+            self.map_canvas.delete("all")
+            self._drawn_markers.clear()
+            self._hover_point_id = None
+            self._heatmap_key = None
+            self._draw_static_layer(w, h)
+            self._static_size = (w, h)
+        if self._map_mode.get() == "heatmap":
+            for key in list(self._drawn_markers):
+                self._erase_marker(key)
+            self._render_heatmap(w, h)
+        else:
+            if self._heatmap_key is not None:
+                self.map_canvas.delete("heatmap")
+                self._heatmap_key = None
+                self._heatmap_image = None
+            self._sync_point_layer(w, h)
+        self._draw_route(w, h)
+
+    def _draw_route(self, w, h):
+        canvas = self.map_canvas
+        canvas.delete("route")
+        if not self._route_ids:
+            return
+        kx = w / 360.0
+        ky = h / 180.0
+        segments = [[]]
+        prev_x = None
+        for pid in self._route_ids:
+            p = self.manager.get_point_by_id(pid)
+            if p is None:
+                continue
+            x = (p.signed_longitude + 180.0) * kx
+            y = (90.0 - p.signed_latitude) * ky
+            if prev_x is not None and abs(x - prev_x) > w / 2:
+                segments.append([])
+            segments[-1].extend((x, y))
+            prev_x = x
+        for coords in segments:
+            if len(coords) >= 4:
+                canvas.create_line(*coords, fill="#e65100", width=2, tags=("route",))
+        canvas.tag_raise("route", "grid")
+
+    def set_map_mode(self):
+        if self._map_mode.get() == "heatmap" and np is None:
+            self._map_mode.set("points")
+            messagebox.showerror("Помилка", "Для теплової карти потрібен пакет numpy.")
+        self.draw_map()
+
+    def _render_heatmap(self, w, h):
+        grid = self.manager.density_grid()
+        key = (grid.version, w, h)
+        if key == self._heatmap_key:
+            return
+        counts = grid.counts.astype(np.float64)
+        total = counts.sum(axis=0)
+        palette = np.array([self._hex_to_rgb(self._surface_color(s)) for s in SURFACES], dtype=np.float64)
+        mix = np.einsum('src,sk->rck', counts, palette) / np.maximum(total, 1.0)[..., None]
+        peak = total.max()
+        alpha = np.where(total > 0, 0.25 + 0.75 * np.log1p(total) / np.log1p(max(peak, 1.0)), 0.0)[..., None]
+        background = np.array(self._hex_to_rgb('#fafafa'), dtype=np.float64)
+        rgb = background * (1.0 - alpha) + mix * alpha
+
+        rows = np.arange(h) * grid.rows // h
+        cols = np.arange(w) * grid.cols // w
+        pixels = rgb[rows][:, cols].astype(np.uint8)
+        data = b"P6 %d %d 255\n" % (w, h) + pixels.tobytes()
+        self._heatmap_image = tk.PhotoImage(width=w, height=h, data=data, format="PPM")
+        self.map_canvas.delete("heatmap")
+        self.map_canvas.create_image(0, 0, anchor="nw", image=self._heatmap_image, tags=("heatmap",))
+        self.map_canvas.tag_lower("heatmap")
+        self._heatmap_key = key
 
 
 if __name__ == "__main__":
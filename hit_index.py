@@ -0,0 +1,41 @@
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+CellKey = Tuple[int, int]
+
+
+class ScreenHitIndex:
+    def __init__(self, cell_px: float = 16.0):
+        self.cell_px = float(cell_px)
+        self._cells: Dict[CellKey, List[Tuple[float, float, Any]]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(c) for c in self._cells.values())
+
+    def clear(self) -> None:
+        self._cells = {}
+
+    def build(self, entries: Iterable[Tuple[float, float, Any]]) -> None:
+        cells: Dict[CellKey, List[Tuple[float, float, Any]]] = {}
+        size = self.cell_px
+        for entry in entries:
+            key = (int(entry[0] // size), int(entry[1] // size))
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [entry]
+            else:
+                bucket.append(entry)
+        self._cells = cells
+
+    def find(self, x: float, y: float, radius: Optional[float] = None) -> Optional[Any]:
+        radius = self.cell_px if radius is None else min(radius, self.cell_px)
+        ci, cj = int(x // self.cell_px), int(y // self.cell_px)
+        best = None
+        best_d = radius
+        for i in (ci - 1, ci, ci + 1):
+            for j in (cj - 1, cj, cj + 1):
+                for ex, ey, obj in self._cells.get((i, j), ()):
+                    d = math.hypot(ex - x, ey - y)
+                    if d <= best_d:
+                        best, best_d = obj, d
+        return best
@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from point import MapPoint
+
+FSYNC_POLICIES = ('always', 'interval', 'never')
+
+
+def point_record(op: str, p: MapPoint) -> list:
+    return [op, p.id, p.latitude, p.latitude_hemisphere == 'S', p.longitude,
+            p.longitude_hemisphere == 'W', p.location_name, p.surface_code]
+
+
+def point_from_record(record: list) -> MapPoint:
+    _, point_id, lat, lat_hem, lon, lon_hem, location, surface = record
+    return MapPoint.from_state(point_id, lat, int(lat_hem), lon, int(lon_hem), location, surface)
+
+
+def read_journal(path: str) -> Tuple[List[list], int]:
+    records: List[list] = []
+    valid = 0
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return records, 0
+    with f:
+        for line_no, line in enumerate(f, 1):
+            if not line.endswith(b'\n'):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                if f.read(1):
+                    raise ValueError(f"Журнал пошкоджений, рядок {line_no}")
+                break
+            records.append(record)
+            valid += len(line)
+    return records, valid
+
+
+class Journal:
+    def __init__(self, path: str, fsync: str = 'interval', interval: float = 0.5):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Невідома політика fsync: {fsync}")
+        self.path = path
+        self.fsync = fsync
+        self.interval = interval
+        self.records_written = 0
+        _, valid = read_journal(path)
+        self._file = open(path, 'ab')
+        if self._file.tell() != valid:
+            self._file.truncate(valid)
+        self._buffer: List[bytes] = []
+        self._pending = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name='journal-writer', daemon=True)
+        self._thread.start()
+
+    def append(self, record: list) -> None:
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+        with self._cond:
+            if self._closed:
+                raise ValueError("Журнал закрито")
+            self._buffer.append(line)
+            self._pending += 1
+            self.records_written += 1
+            if self.fsync == 'always' or len(self._buffer) >= 1024:
+                self._cond.notify()
+
+    def _run(self) -> None:
+        last_sync = time.monotonic()
+        dirty = False
+        while True:
+            with self._cond:
+                if not self._buffer and not self._closed:
+                    self._cond.wait(self.interval)
+                batch, self._buffer = self._buffer, []
+                closed = self._closed
+            try:
+                if batch:
+                    self._file.write(b''.join(batch))
+                    self._file.flush()
+                    dirty = True
+                now = time.monotonic()
+                if dirty and (self.fsync == 'always' or
+                              (self.fsync == 'interval' and now - last_sync >= self.interval)):
+                    os.fsync(self._file.fileno())
+                    last_sync = now
+                    dirty = False
+            except OSError as e:
+                self._error = e
+            with self._cond:
+                self._pending -= len(batch)
+                self._cond.notify_all()
+            if closed and not batch:
+                return
+
+    def flush(self) -> None:
+        with self._cond:
+            self._cond.notify()
+            while self._pending and self._thread.is_alive():
+                self._cond.wait(0.1)
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+        if self.fsync != 'never':
+            os.fsync(self._file.fileno())
+
+    def truncate(self) -> None:
+        self.flush()
+        with self._cond:
+            self._file.truncate(0)
+            self._file.seek(0)
+            os.fsync(self._file.fileno())
+            self.records_written = 0
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        try:
+            self.flush()
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify()
+            self._thread.join()
+            self._file.close()
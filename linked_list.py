@@ -2,30 +2,105 @@ from typing import Iterable, Iterator, List, Any, Optional
 
 
 class Node:
+    __slots__ = ('data', 'next_node', 'prev_node')
+
     def __init__(self, data: Any = None):
         self.data = data
         self.next_node: Optional['Node'] = None
+        self.prev_node: Optional['Node'] = None
 
     def __repr__(self) -> str:
         return f"Node({self.data!r})"
 
 
 class LinkedList:
-    def __init__(self):
+    def __init__(self, items: Optional[Iterable[Any]] = None):
         self.head: Optional[Node] = None
+        self.tail: Optional[Node] = None
         self._size: int = 0
+        if items is not None:
+            self.extend(items)
+
+    def append(self, data: Any) -> Node:
+        new_node = Node(data)
+        if self.tail is None:
+            self.head = self.tail = new_node
+        else:
+            new_node.prev_node = self.tail
+            self.tail.next_node = new_node
+            self.tail = new_node
+        self._size += 1
+        return new_node
 
-    def append(self, data: Any) -> None:
+    def appendleft(self, data: Any) -> Node:
         new_node = Node(data)
         if self.head is None:
+            self.head = self.tail = new_node
+        else:
+            new_node.next_node = self.head
+            self.head.prev_node = new_node
             self.head = new_node
-            self._size = 1
-            return
-        last = self.head
-        while last.next_node:
-            last = last.next_node
-        last.next_node = new_node
         self._size += 1
+        return new_node
+
+    def extend(self, items: Iterable[Any]) -> None:
+        for item in items:
+            self.append(item)
+
+    def extend_nodes(self, items: Iterable[Any]) -> List[Node]:
+        nodes = [Node(item) for item in items]
+        prev = self.tail
+        for node in nodes:
+            node.prev_node = prev
+            if prev is None:
+                self.head = node
+            else:
+                prev.next_node = node
+            prev = node
+        self.tail = prev
+        self._size += len(nodes)
+        return nodes
+
+    def insert_before(self, node: Node, data: Any) -> Node:
+        if node is self.head:
+            return self.appendleft(data)
+        new_node = Node(data)
+        prev = node.prev_node
+        new_node.prev_node = prev
+        new_node.next_node = node
+        prev.next_node = new_node
+        node.prev_node = new_node
+        self._size += 1
+        return new_node
+
+    def insert_after(self, node: Node, data: Any) -> Node:
+        if node is self.tail:
+            return self.append(data)
+        return self.insert_before(node.next_node, data)
+
+    def unlink(self, node: Node) -> Any:
+        prev, nxt = node.prev_node, node.next_node
+        if prev is None:
+            self.head = nxt
+        else:
+            prev.next_node = nxt
+        if nxt is None:
+            self.tail = prev
+        else:
+            nxt.prev_node = prev
+        node.prev_node = node.next_node = None
+        self._size -= 1
+        return node.data
+
+    def pop(self) -> Any:
+        if self.tail is None:
+            raise IndexError("Неможливо видалити з порожнього списку")
+        return self.unlink(self.tail)
+
+    def popleft(self) -> Any:
+        if self.head is None:
+            raise IndexError("Неможливо видалити з порожнього списку")
+        return self.unlink(self.head)
 
     def __len__(self) -> int:
         return self._size
@@ -36,6 +111,18 @@ class LinkedList:
             yield cur.data
             cur = cur.next_node
 
+    def __reversed__(self) -> Iterator[Any]:
+        cur = self.tail
+        while cur:
+            yield cur.data
+            cur = cur.prev_node
+
+    def iter_nodes(self) -> Iterator[Node]:
+        cur = self.head
+        while cur:
+            yield cur
+            cur = cur.next_node
+
     def to_list(self) -> List[Any]:
         return list(self)
 
@@ -54,13 +141,14 @@ class LinkedList:
     def _node_at(self, index: int) -> Node:
         if index < 0 or index >= self._size:
             raise IndexError("Індекс виходить за межі списку")
-        cur = self.head
-        i = 0
-        while cur and i < index:
-            cur = cur.next_node
-            i += 1
-        if cur is None:
-            raise IndexError("Індекс виходить за межі списку")
+        if index < self._size // 2:
+            cur = self.head
+            for _ in range(index):
+                cur = cur.next_node
+        else:
+            cur = self.tail
+            for _ in range(self._size - 1 - index):
+                cur = cur.prev_node
         return cur
 
     def __getitem__(self, index: int) -> Any:
@@ -76,16 +164,7 @@ class LinkedList:
             raise IndexError("Неможливо видалити з порожнього списку")
         if index_to_remove < 0 or index_to_remove >= self._size:
             raise IndexError("Індекс виходить за межі списку")
-        if index_to_remove == 0:
-            self.head = self.head.next_node
-            self._size -= 1
-            return
-        prev = self._node_at(index_to_remove - 1)
-        node_to_delete = prev.next_node
-        if node_to_delete is None:
-            raise IndexError("Індекс виходить за межі списку")
-        prev.next_node = node_to_delete.next_node
-        self._size -= 1
+        self.unlink(self._node_at(index_to_remove))
 
     def __delitem__(self, index: int) -> None:
         self.remove(index)
@@ -0,0 +1,104 @@
+import bisect
+import os
+import random
+import sys
+import time
+from typing import List, Optional, Tuple
+
+MISSING_NAME = "Невідоме місце (файл {path} не знайдено)"
+EMPTY_NAME = "Невідоме місце (файл {path} порожній)"
+
+
+class LocationCatalog:
+    def __init__(self, path: str = 'locations.txt', check_interval: float = 1.0, encoding: str = 'utf-8'):
+        self.path = path
+        self.encoding = encoding
+        self.check_interval = check_interval
+        self.version = 0
+        self._names: Optional[List[str]] = None
+        self._keys: Optional[List[str]] = None
+        self._sorted: Optional[List[str]] = None
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._missing = False
+        self._next_check = 0.0
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _load(self, stamp: Optional[Tuple[int, int]]) -> None:
+        names: List[str] = []
+        if stamp is not None:
+            try:
+                with open(self.path, 'r', encoding=self.encoding) as f:
+                    names = [sys.intern(line.strip()) for line in f if line.strip()]
+            except FileNotFoundError:
+                stamp = None
+        self._names = names
+        self._keys = None
+        self._sorted = None
+        self._stamp = stamp
+        self._missing = stamp is None
+        self.version += 1
+
+    def _ensure(self) -> List[str]:
+        now = time.monotonic()
+        if self._names is None or now >= self._next_check:
+            self._next_check = now + self.check_interval
+            stamp = self._stat()
+            if self._names is None or stamp != self._stamp:
+                self._load(stamp)
+        return self._names
+
+    def reload(self) -> None:
+        self._next_check = time.monotonic() + self.check_interval
+        self._load(self._stat())
+
+    @property
+    def missing(self) -> bool:
+        self._ensure()
+        return self._missing
+
+    @property
+    def names(self) -> List[str]:
+        return self._ensure()
+
+    def __len__(self) -> int:
+        return len(self._ensure())
+
+    def __contains__(self, name: str) -> bool:
+        key = name.strip().casefold()
+        keys, _ = self._index()
+        i = bisect.bisect_left(keys, key)
+        return i < len(keys) and keys[i] == key
+
+    def placeholders(self) -> List[str]:
+        names = self._ensure()
+        if names:
+            return names
+        template = MISSING_NAME if self._missing else EMPTY_NAME
+        return [template.format(path=os.path.basename(self.path))]
+
+    def random_choice(self, rng: Optional[random.Random] = None) -> str:
+        return (rng or random).choice(self.placeholders())
+
+    def _index(self) -> Tuple[List[str], List[str]]:
+        names = self._ensure()
+        if self._keys is None:
+            self._sorted = sorted(set(names), key=str.casefold)
+            self._keys = [name.casefold() for name in self._sorted]
+        return self._keys, self._sorted
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        key = prefix.strip().casefold()
+        keys, names = self._index()
+        start = bisect.bisect_left(keys, key)
+        result = []
+        for i in range(start, min(len(keys), start + limit)):
+            if not keys[i].startswith(key):
+                break
+            result.append(names[i])
+        return result
@@ -1,105 +1,618 @@
-from point import MapPoint
-from linked_list import LinkedList
-from typing import Optional, List
+from point import MapPoint, SURFACE_CODES
+from linked_list import LinkedList, Node
+from order_index import OrderIndex
+from point_store import ColumnarPointStore
+from spatial_index import GridIndex
+from density_grid import DensityGrid
+from point_import import ImportReport, import_points
+from sort_order import make_sort_key, parse_sort_keys
+from query import Eq, Predicate, QueryEngine
+from snapshot import Snapshot, save_snapshot
+from journal import Journal, point_from_record, point_record, read_journal
+from profiling import instrumented
+import geo
+from tour import plan_tour
+import os
+import functools
+import gc
+import heapq
+from collections import Counter
+import warnings
+from typing import Callable, Dict, Iterable, Iterator, Optional, List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 MAX_POINTS = 30
+PROGRESS_CHUNK = 65536
+BACKENDS = ('linked', 'columnar')
+CAPACITY_MODES = ('hard', 'soft', 'unlimited')
+
+# Бюджет пам'яті (CPython 3.11, виміряно tracemalloc на 10^5 точок):
+# ~620 байт на точку для 'linked' (MapPoint ~176 байт, вузол списку, індекси id/порядку/сітки)
+# і ~730 байт для 'columnar'. Індекси QueryEngine після першого query()/filter_by() додають
+# ще ~300 байт на точку (~920 байт разом). 10^6 точок займають приблизно 0.6-0.9 ГБ.
+
+
+class CapacityWarning(UserWarning):
+    pass
+
 
+def _with_progress(items: Iterable, total: int, progress: Callable[[int, int], None]) -> Iterator:
+    for n, item in enumerate(items):
+        if n % PROGRESS_CHUNK == 0:
+            progress(n, total)
+        yield item
+
+
+def _materialized(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._snapshot is not None:
+            self._materialize_snapshot()
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+@instrumented
 class MapManager:
-    def __init__(self):
+    def __init__(self, backend: str = 'linked', max_points: Optional[int] = MAX_POINTS,
+                 capacity_mode: str = 'hard'):
+        if backend not in BACKENDS:
+            raise ValueError(f"Невідомий тип сховища: {backend!r}")
+        self.backend = backend
+        self.set_capacity(max_points, capacity_mode)
         self._points = LinkedList()
+        self._nodes: Dict[int, Node] = {}
+        self._order = OrderIndex()
+        self._store: Optional[ColumnarPointStore] = ColumnarPointStore() if backend == 'columnar' else None
+        self._spatial = GridIndex()
+        self._density: Optional[DensityGrid] = None
+        self._engine: Optional[QueryEngine] = None
+        self._indexes = [self._spatial]
+        self._stale_indexes = []
+        if self._store is not None:
+            self._indexes.append(self._store)
+        self._store_order_stale = False
+        self._snapshot: Optional[Snapshot] = None
+        self._journal: Optional[Journal] = None
+        self._journal_base: Optional[str] = None
+        self.compact_every = 50000
+        self.sort_keys: Optional[Tuple[str, ...]] = None
+        self._sort_key: Optional[Callable[[MapPoint], tuple]] = None
+
+    def _drop_snapshot(self) -> None:
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+
+    def _materialize_snapshot(self) -> None:
+        snapshot = self._snapshot
+        self._snapshot = None
+        try:
+            self._reset_points(snapshot)
+        finally:
+            snapshot.close()
+
+    def _reset_points(self, points: Iterable[MapPoint]) -> None:
+        if self._sort_key is not None:
+            points = sorted(points, key=self._sort_key)
+        elif not isinstance(points, list):
+            points = list(points)
+        ids = [p.id for p in points]
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            linked = LinkedList()
+            nodes = dict(zip(ids, linked.extend_nodes(points)))
+            if len(nodes) != len(ids):
+                duplicate = next(pid for pid, n in Counter(ids).items() if n > 1)
+                raise ValueError(f"Точка з ID {duplicate} вже є у списку")
+            eager = [index for index in (self._store, self._density) if index is not None]
+            self._stale_indexes += [index for index in self._indexes if index not in eager]
+            self._indexes = eager
+            self._store_order_stale = False
+            self._points = linked
+            self._nodes = nodes
+            self._order.rebuild(ids)
+            for index in eager:
+                index.rebuild(linked)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def _iter_points(self, progress: Optional[Callable[[int, int], None]] = None) -> Iterable[MapPoint]:
+        if progress is None:
+            return self._points
+        return _with_progress(self._points, len(self._points), progress)
+
+    def _fresh(self, index, progress: Optional[Callable[[int, int], None]] = None):
+        if index in self._stale_indexes:
+            index.rebuild(self._iter_points(progress))
+            self._stale_indexes.remove(index)
+            self._indexes.append(index)
+        return index
+
+    def _link_point(self, point: MapPoint) -> None:
+        if point.id in self._nodes:
+            raise ValueError(f"Точка з ID {point.id} вже є у списку")
+        if self._sort_key is None:
+            self._nodes[point.id] = self._points.append(point)
+            self._order.append(point.id)
+        else:
+            self._insert_sorted(point)
+        for index in self._indexes:
+            index.add(point)
+        if self._journal is not None:
+            self._journal.append(point_record('a', point))
+
+    def _insert_sorted(self, point: MapPoint) -> None:
+        sort_key = self._sort_key
+        nodes = self._nodes
+        pos = self._order.bisect_right(sort_key(point), key=lambda pid: sort_key(nodes[pid].data))
+        if pos >= len(self._order):
+            nodes[point.id] = self._points.append(point)
+            self._order.append(point.id)
+        else:
+            nodes[point.id] = self._points.insert_before(nodes[self._order[pos]], point)
+            self._order.insert(pos, point.id)
+            self._store_order_stale = True
+
+    def _reposition(self, point: MapPoint) -> None:
+        node = self._nodes[point.id]
+        k = self._sort_key(point)
+        prev, nxt = node.prev_node, node.next_node
+        if (prev is None or self._sort_key(prev.data) <= k) and (nxt is None or k <= self._sort_key(nxt.data)):
+            return
+        self._points.unlink(node)
+        self._order.remove(point.id)
+        del self._nodes[point.id]
+        self._insert_sorted(point)
+        self._store_order_stale = True
 
-    def fill_random_points(self, count: int = 10, reset_ids: bool = False) -> int:
-        if count > MAX_POINTS:
-            count = MAX_POINTS
+    def _unlink_point(self, point_id: int) -> MapPoint:
+        node = self._nodes.pop(point_id)
+        self._order.remove(point_id)
+        for index in self._indexes:
+            index.remove(node.data)
+        if self._journal is not None:
+            self._journal.append(['r', point_id])
+        return self._points.unlink(node)
+
+    def _point_changed(self, point: MapPoint) -> None:
+        for index in self._indexes:
+            index.update(point)
+        if self._sort_key is not None:
+            self._reposition(point)
+        if self._journal is not None:
+            self._journal.append(point_record('u', point))
+
+    def _ordered_store(self) -> ColumnarPointStore:
+        if self._store_order_stale:
+            self._store.rebuild(self._points)
+            self._store_order_stale = False
+        return self._store
+
+    def set_capacity(self, max_points: Optional[int] = MAX_POINTS, capacity_mode: str = 'hard') -> None:
+        if capacity_mode not in CAPACITY_MODES:
+            raise ValueError(f"Невідомий режим ліміту: {capacity_mode!r}")
+        if capacity_mode != 'unlimited' and (max_points is None or max_points < 1):
+            raise ValueError("Ліміт точок повинен бути додатним числом")
+        self.capacity_mode = capacity_mode
+        self.max_points = None if capacity_mode == 'unlimited' else int(max_points)
+
+    def capacity_left(self) -> Optional[int]:
+        if self.capacity_mode != 'hard':
+            return None
+        return max(0, self.max_points - self.get_active_count())
+
+    def _check_capacity(self, total: int) -> None:
+        if self.max_points is None or total <= self.max_points:
+            return
+        if self.capacity_mode == 'hard':
+            raise ValueError(f"Нельзя добавить более {self.max_points} точек")
+        warnings.warn(f"Кількість точок ({total}) перевищує м'який ліміт {self.max_points}",
+                      CapacityWarning, stacklevel=3)
+
+    def fill_random_points(self, count: int = 10, reset_ids: bool = False, seed: Optional[int] = None,
+                           workers: Optional[int] = None,
+                           progress: Optional[Callable[[int, int], None]] = None) -> int:
+        if self.capacity_mode == 'hard' and count > self.max_points:
+            count = self.max_points
+        self._check_capacity(count)
+        next_id = MapPoint.get_instance_count()
         if reset_ids:
             MapPoint.reset_instance_counter()
-        self._points = LinkedList()
-        created = 0
-        for _ in range(count):
-            if len(self._points) >= MAX_POINTS:
-                break
-            self._points.append(MapPoint())
-            created += 1
-        return created
+        try:
+            points = MapPoint.generate(count, seed=seed, workers=workers, progress=progress)
+        except BaseException:
+            MapPoint._instance_counter = next_id
+            raise
+        self._drop_snapshot()
+        self._reset_points(points)
+        if self._journal is not None:
+            self.compact()
+        return len(self._points)
 
+    @_materialized
     def append_point(self, point: MapPoint) -> None:
-        if len(self._points) >= MAX_POINTS:
-            raise ValueError(f"Нельзя добавить более {MAX_POINTS} точек")
-        self._points.append(point)
+        self._check_capacity(len(self._points) + 1)
+        self._link_point(point)
 
+    @_materialized
     def add_point(self, manual_data: Optional[dict] = None) -> MapPoint:
-        if len(self._points) >= MAX_POINTS:
-            raise ValueError(f"Нельзя добавить более {MAX_POINTS} точек")
+        self._check_capacity(len(self._points) + 1)
         p = MapPoint(manual_data)
-        self._points.append(p)
+        self._link_point(p)
         return p
 
+    @_materialized
+    def extend_points(self, points: Iterable[MapPoint]) -> int:
+        pts = list(points)
+        self._check_capacity(len(self._points) + len(pts))
+        if self._sort_key is not None and len(pts) > 1000 and len(pts) * 8 > len(self._points):
+            if any(p.id in self._nodes for p in pts):
+                raise ValueError("Точка з таким ID вже є у списку")
+            pts.sort(key=self._sort_key)
+            self._reset_points(heapq.merge(self._points, pts, key=self._sort_key))
+            if self._journal is not None:
+                for p in pts:
+                    self._journal.append(point_record('a', p))
+            return len(pts)
+        for p in pts:
+            self._link_point(p)
+        return len(pts)
+
+    def import_file(self, path: str, fmt: Optional[str] = None, chunk_size: int = 10000,
+                    progress: Optional[Callable[[int, int], None]] = None) -> ImportReport:
+        return import_points(self, path, fmt=fmt, chunk_size=chunk_size, progress=progress)
+
+    @_materialized
     def remove_point_by_id(self, point_id: int) -> bool:
-        idx = -1
-        for i, p in enumerate(self._points):
-            if p.id == point_id:
-                idx = i
-                break
-        if idx == -1:
+        if point_id not in self._nodes:
+            return False
+        self._unlink_point(point_id)
+        return True
+
+    @_materialized
+    def update_coordinates(self, point_id: int, lat: float, lat_hem: str, lon: float, lon_hem: str) -> bool:
+        p = self.get_point_by_id(point_id)
+        if p is None:
+            return False
+        p.update_coordinates(lat, lat_hem, lon, lon_hem)
+        self._point_changed(p)
+        return True
+
+    @_materialized
+    def set_location_name(self, point_id: int, new_name: str) -> bool:
+        p = self.get_point_by_id(point_id)
+        if p is None:
             return False
-        self._points.remove(idx)
+        p.set_location_name(new_name)
+        self._point_changed(p)
         return True
 
+    @_materialized
     def remove_point_by_index(self, index: int) -> None:
-        self._points.remove(index)
+        self._unlink_point(self._order[index])
 
+    @_materialized
     def get_point_by_id(self, point_id: int):
-        for p in self._points:
-            if p.id == point_id:
-                return p
-        return None
+        node = self._nodes.get(point_id)
+        return node.data if node is not None else None
 
     def get_point_by_index(self, index: int):
+        if self._snapshot is not None and self._sort_key is None:
+            try:
+                return self._snapshot[index]
+            except IndexError:
+                return None
+        elif self._snapshot is not None:
+            self._materialize_snapshot()
         try:
-            return self._points[index]
+            return self._nodes[self._order[index]].data
         except IndexError:
             return None
 
+    @_materialized
     def get_all_points(self) -> LinkedList:
         return self._points
 
+    @_materialized
     def get_all_points_list(self) -> List[MapPoint]:
         return self._points.to_list()
 
     def to_list(self) -> List[MapPoint]:
         return self.get_all_points_list()
 
+    @_materialized
     def get_order_number(self, point_id: int):
-        for idx, p in enumerate(self._points):
-            if p.id == point_id:
-                return idx + 1
-        return None
+        if point_id not in self._nodes:
+            return None
+        return self._order.index(point_id) + 1
 
-    def sort_by_location_name(self) -> None:
-        if len(self._points) < 2:
-            return
-        temp = self._points.to_list()
-        temp.sort(key=lambda p: p.location_name)
-        new_ll = LinkedList()
-        for p in temp:
-            new_ll.append(p)
-        self._points = new_ll
-
-    def filter_by(self, key: str, value: str):
+    def sort_by_location_name(self, progress: Optional[Callable[[int, int], None]] = None) -> None:
+        self.sort_by(['location'], progress=progress)
+
+    @_materialized
+    def sort_by(self, keys: Sequence[str], persistent: bool = False,
+                progress: Optional[Callable[[int, int], None]] = None) -> None:
+        keys = parse_sort_keys(keys)
+        if persistent:
+            self.sort_keys = keys
+            self._sort_key = make_sort_key(keys, unique=True)
+            self._reset_points(self._points)
+        elif len(self._points) < 2:
+            self.sort_keys = None
+            self._sort_key = None
+        else:
+            temp = self._points.to_list()
+            key = make_sort_key(keys)
+            if progress is None:
+                temp.sort(key=key)
+            else:
+                ranks = [key(p) for p in _with_progress(temp, len(temp), progress)]
+                temp = [temp[i] for i in sorted(range(len(temp)), key=ranks.__getitem__)]
+            self.sort_keys = None
+            self._sort_key = None
+            self._reset_points(temp)
+        if self._journal is not None:
+            self._journal.append(['s', keys, persistent])
+
+    def clear_sort_order(self) -> None:
+        if self._journal is not None and self._sort_key is not None:
+            self._journal.append(['s', None, False])
+        self.sort_keys = None
+        self._sort_key = None
+
+    def _filter_criteria(self, key: str, value: str) -> Optional[dict]:
         key = key.lower()
-        res = []
         if key == 'surface':
-            v = value.strip().lower()
-            res = [p for p in self._points if getattr(p, 'surface', '').lower() == v]
-        elif key == 'hem_lat':
+            return {'surface': value.strip().lower()}
+        if key == 'hem_lat':
             v = value.strip().upper()
-            if v in ('N', 'S'):
-                res = [p for p in self._points if getattr(p, 'latitude_hemisphere', '') == v]
-        elif key == 'hem_lon':
+            return {'hem_lat': v} if v in ('N', 'S') else None
+        if key == 'hem_lon':
             v = value.strip().upper()
-            if v in ('E', 'W'):
-                res = [p for p in self._points if getattr(p, 'longitude_hemisphere', '') == v]
-        return res
+            return {'hem_lon': v} if v in ('E', 'W') else None
+        return None
+
+    def _criteria_ids(self, criteria: dict, progress: Optional[Callable[[int, int], None]] = None):
+        (field, value), = criteria.items()
+        try:
+            return self._query_engine(progress).evaluate(Eq(field, value))
+        except ValueError:
+            return set()
+
+    @_materialized
+    def filter_by(self, key: str, value: str, progress: Optional[Callable[[int, int], None]] = None):
+        criteria = self._filter_criteria(key, value)
+        if criteria is None:
+            return []
+        if self._store is not None:
+            return self._ordered_store().filter(**criteria)
+        return self._points_in_order(self._criteria_ids(criteria, progress))
+
+    def count_by(self, key: str, value: str) -> int:
+        criteria = self._filter_criteria(key, value)
+        if criteria is None:
+            return 0
+        if self._snapshot is not None and np is not None:
+            return int(np.count_nonzero(self._snapshot_mask(**criteria)))
+        elif self._snapshot is not None:
+            self._materialize_snapshot()
+        if self._store is not None:
+            return self._store.count(**criteria)
+        return len(self._criteria_ids(criteria))
+
+    def _query_engine(self, progress: Optional[Callable[[int, int], None]] = None) -> QueryEngine:
+        self._fresh(self._spatial, progress)
+        if self._engine is None:
+            self._engine = QueryEngine(self._spatial, self._iter_points(progress))
+            self._indexes.append(self._engine)
+        return self._fresh(self._engine, progress)
+
+    def _points_in_order(self, ids) -> List[MapPoint]:
+        if not ids:
+            return []
+        nodes = self._nodes
+        return [nodes[pid].data for pid in self._order.ordered(ids)]
+
+    @_materialized
+    def query(self, predicate: Predicate, progress: Optional[Callable[[int, int], None]] = None) -> List[MapPoint]:
+        return self._points_in_order(self._query_engine(progress).evaluate(predicate))
+
+    @_materialized
+    def query_count(self, predicate: Predicate) -> int:
+        return len(self._query_engine().evaluate(predicate))
+
+    def get_land_percentage(self) -> float:
+        if self._snapshot is not None and np is not None:
+            if len(self._snapshot) == 0:
+                return 0.0
+            land = np.count_nonzero(self._snapshot.columns()['surface'] <= SURFACE_CODES['острів'])
+            return land / len(self._snapshot) * 100.0
+        elif self._snapshot is not None:
+            self._materialize_snapshot()
+        if self._store is not None:
+            return self._store.land_percentage()
+        return MapPoint.get_land_percentage_from_list(self._points)
+
+    @_materialized
+    def density_grid(self, rows: int = 180, cols: int = 360) -> DensityGrid:
+        if self._density is not None and (self._density.rows, self._density.cols) == (rows, cols):
+            return self._density
+        if self._density is not None:
+            self._indexes.remove(self._density)
+        self._density = DensityGrid(rows, cols, self._points)
+        self._indexes.append(self._density)
+        return self._density
+
+    @_materialized
+    def points_in_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> List[MapPoint]:
+        return self._fresh(self._spatial).query_bbox(min_lat, min_lon, max_lat, max_lon)
+
+    @_materialized
+    def nearest(self, lat: float, lon: float, k: int = 1) -> List[MapPoint]:
+        return self._fresh(self._spatial).nearest(lat, lon, k)
+
+    @_materialized
+    def distance_between(self, id_a: int, id_b: int) -> Optional[float]:
+        a = self.get_point_by_id(id_a)
+        b = self.get_point_by_id(id_b)
+        if a is None or b is None:
+            return None
+        return geo.point_distance(a, b)
+
+    @_materialized
+    def distances_from(self, lat: float, lon: float) -> List[Tuple[MapPoint, float]]:
+        pts, lats, lons = geo.coordinate_arrays(self._points)
+        return list(zip(pts, geo.haversine_to_many(lat, lon, lats, lons).tolist()))
+
+    @_materialized
+    def pairwise_distances(self, block_size: Optional[int] = None, upper: bool = False):
+        pts, lats, lons = geo.coordinate_arrays(self._points)
+        if block_size is None:
+            return pts, geo.pairwise_matrix(lats, lons)
+        return pts, geo.iter_pairwise_blocks(lats, lons, block_size, upper)
+
+    @_materialized
+    def points_within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[MapPoint, float]]:
+        if radius_km < 0:
+            raise ValueError("Радіус не може бути від'ємним")
+        candidates = self._fresh(self._spatial).query_bbox(*geo.radius_bbox(lat, lon, radius_km))
+        if not candidates:
+            return []
+        pts, lats, lons = geo.coordinate_arrays(candidates)
+        dist = geo.haversine_to_many(lat, lon, lats, lons)
+        hits = np.flatnonzero(dist <= radius_km)
+        hits = hits[np.argsort(dist[hits], kind='stable')]
+        return [(pts[i], float(dist[i])) for i in hits.tolist()]
+
+    def _apply_order(self, ids: Sequence[int]) -> None:
+        ordered = [self._nodes[pid].data for pid in ids if pid in self._nodes]
+        seen = {p.id for p in ordered}
+        ordered.extend(p for p in self._points if p.id not in seen)
+        self._reset_points(ordered)
+        if self._journal is not None:
+            self.compact()
+
+    @_materialized
+    def plan_route(self, predicate: Optional[Predicate] = None, time_budget: float = 2.0,
+                   reorder: bool = True) -> List[MapPoint]:
+        points = self.query(predicate) if predicate is not None else self._points.to_list()
+        route = plan_tour(points, time_budget)
+        if reorder and route:
+            self.clear_sort_order()
+            slots = iter(route)
+            chosen = {p.id for p in route}
+            self._apply_order([next(slots).id if p.id in chosen else p.id for p in self._points])
+        return route
 
     def get_active_count(self) -> int:
+        if self._snapshot is not None:
+            return len(self._snapshot)
         return len(self._points)
+
+    def _snapshot_mask(self, surface: Optional[str] = None, hem_lat: Optional[str] = None,
+                       hem_lon: Optional[str] = None):
+        cols = self._snapshot.columns()
+        mask = np.ones(len(cols), dtype=np.bool_)
+        if surface is not None:
+            mask &= cols['surface'] == SURFACE_CODES.get(surface, 255)
+        if hem_lat is not None:
+            mask &= cols['lat_hem'] == (hem_lat == 'S')
+        if hem_lon is not None:
+            mask &= cols['lon_hem'] == (hem_lon == 'W')
+        return mask
+
+    def save(self, path: str, progress: Optional[Callable[[int, int], None]] = None) -> int:
+        if self._snapshot is not None:
+            self._materialize_snapshot()
+        count = save_snapshot(self._points, path, progress=progress)
+        self._discard_journal(path + '.journal')
+        return count
+
+    def _discard_journal(self, journal_path: str) -> None:
+        if self._journal is not None and os.path.abspath(self._journal.path) == os.path.abspath(journal_path):
+            self._journal.truncate()
+        elif os.path.exists(journal_path):
+            os.remove(journal_path)
+
+    def load(self, path: str) -> int:
+        self.close_journal()
+        snapshot = Snapshot(path)
+        self._drop_snapshot()
+        self._reset_points(())
+        if snapshot.next_id > MapPoint.get_instance_count():
+            MapPoint._instance_counter = snapshot.next_id
+        self._snapshot = snapshot
+        return len(snapshot)
+
+    def _apply_record(self, record: list) -> None:
+        op = record[0]
+        if op == 'a' or op == 'u':
+            p = point_from_record(record)
+            node = self._nodes.get(p.id)
+            if node is None:
+                self._link_point(p)
+            else:
+                node.data.update_coordinates(p.latitude, p.latitude_hemisphere,
+                                             p.longitude, p.longitude_hemisphere)
+                node.data.set_location_name(p.location_name)
+                self._point_changed(node.data)
+        elif op == 'r':
+            if record[1] in self._nodes:
+                self._unlink_point(record[1])
+        elif op == 'o':
+            self._apply_order(record[1])
+        elif op == 's':
+            if record[1] is None:
+                self.clear_sort_order()
+            else:
+                self.sort_by(record[1], persistent=record[2])
+        else:
+            raise ValueError(f"Невідомий запис журналу: {op}")
+
+    def open_journal(self, path: str, fsync: str = 'interval', compact_every: int = 50000,
+                     replay: bool = True, progress: Optional[Callable[[int, int], None]] = None) -> int:
+        self.close_journal()
+        journal_path = path + '.journal'
+        records: List[list] = []
+        if replay:
+            if os.path.exists(path):
+                self.load(path)
+            else:
+                self.fill_random_points(0)
+            records, _ = read_journal(journal_path)
+            if records and self._snapshot is not None:
+                self._materialize_snapshot()
+            for record in records if progress is None else _with_progress(records, len(records), progress):
+                self._apply_record(record)
+        elif os.path.exists(journal_path):
+            os.remove(journal_path)
+        self._journal = Journal(journal_path, fsync=fsync)
+        self._journal.records_written = len(records)
+        self._journal_base = path
+        self.compact_every = compact_every
+        return len(records)
+
+    def needs_compaction(self) -> bool:
+        return self._journal is not None and self._journal.records_written >= self.compact_every
+
+    def compact(self, progress: Optional[Callable[[int, int], None]] = None) -> None:
+        if self._journal is None:
+            return
+        self.save(self._journal_base, progress=progress)
+
+    def flush_journal(self) -> None:
+        if self._journal is not None:
+            self._journal.flush()
+
+    def close_journal(self) -> None:
+        if self._journal is not None:
+            journal, self._journal = self._journal, None
+            self._journal_base = None
+            journal.close()
@@ -0,0 +1,186 @@
+from bisect import bisect_right
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Set
+
+
+class OrderIndex:
+    _LOAD = 256
+
+    def __init__(self, keys: Optional[Iterable[Hashable]] = None):
+        self._blocks: List[List[Hashable]] = []
+        self._block_of: Dict[Hashable, List[Hashable]] = {}
+        self._pos: Dict[int, int] = {}
+        self._tree: List[int] = [0]
+        self._size: int = 0
+        if keys is not None:
+            self.rebuild(keys)
+
+    def clear(self) -> None:
+        self._blocks = []
+        self._block_of = {}
+        self._pos = {}
+        self._tree = [0]
+        self._size = 0
+
+    def _reindex(self) -> None:
+        blocks = self._blocks
+        n = len(blocks)
+        tree = [0] * (n + 1)
+        for i, block in enumerate(blocks, 1):
+            tree[i] += len(block)
+            j = i + (i & -i)
+            if j <= n:
+                tree[j] += tree[i]
+        self._tree = tree
+        self._pos = {id(block): i for i, block in enumerate(blocks)}
+
+    def _add(self, pos: int, delta: int) -> None:
+        tree = self._tree
+        i = pos + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, pos: int) -> int:
+        tree = self._tree
+        total = 0
+        while pos > 0:
+            total += tree[pos]
+            pos -= pos & -pos
+        return total
+
+    def _push_block(self) -> List[Hashable]:
+        block: List[Hashable] = []
+        self._pos[id(block)] = len(self._blocks)
+        self._blocks.append(block)
+        i = len(self._blocks)
+        self._tree.append(self._prefix(i - 1) - self._prefix(i - (i & -i)))
+        return block
+
+    def rebuild(self, keys: Iterable[Hashable]) -> None:
+        self.clear()
+        flat = list(keys)
+        for start in range(0, len(flat), self._LOAD):
+            block = flat[start:start + self._LOAD]
+            self._blocks.append(block)
+            for key in block:
+                self._block_of[key] = block
+        self._size = len(flat)
+        self._reindex()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._block_of
+
+    def __iter__(self) -> Iterator[Hashable]:
+        for block in self._blocks:
+            yield from block
+
+    def _locate(self, index: int):
+        if index < 0 or index >= self._size:
+            raise IndexError("Індекс виходить за межі списку")
+        tree = self._tree
+        pos = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(tree) and tree[nxt] <= index:
+                pos = nxt
+                index -= tree[nxt]
+            step >>= 1
+        return pos, index
+
+    def __getitem__(self, index: int) -> Hashable:
+        pos, offset = self._locate(index)
+        return self._blocks[pos][offset]
+
+    def index(self, key: Hashable) -> int:
+        block = self._block_of.get(key)
+        if block is None:
+            raise KeyError(key)
+        return self._prefix(self._pos[id(block)]) + block.index(key)
+
+    def bisect_right(self, value: Any, key: Callable[[Hashable], Any]) -> int:
+        lo, hi = 0, len(self._blocks)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if value < key(self._blocks[mid][-1]):
+                hi = mid
+            else:
+                lo = mid + 1
+        if lo == len(self._blocks):
+            return self._size
+        return self._prefix(lo) + bisect_right(self._blocks[lo], value, key=key)
+
+    def ordered(self, keys: Set[Hashable]) -> List[Hashable]:
+        if len(keys) * 64 >= self._size:
+            return [key for block in self._blocks for key in block if key in keys]
+        groups: Dict[int, Set[Hashable]] = {}
+        pos_of, block_of = self._pos, self._block_of
+        for key in keys:
+            groups.setdefault(pos_of[id(block_of[key])], set()).add(key)
+        result: List[Hashable] = []
+        for pos in sorted(groups):
+            wanted = groups[pos]
+            block = self._blocks[pos]
+            if len(wanted) == len(block):
+                result.extend(block)
+            elif len(wanted) <= 16:
+                result.extend(sorted(wanted, key=block.index))
+            else:
+                result.extend(key for key in block if key in wanted)
+        return result
+
+    def append(self, key: Hashable) -> None:
+        if key in self._block_of:
+            raise ValueError(f"Ключ {key!r} вже є в індексі")
+        if not self._blocks or len(self._blocks[-1]) >= self._LOAD:
+            self._push_block()
+        block = self._blocks[-1]
+        block.append(key)
+        self._block_of[key] = block
+        self._add(len(self._blocks) - 1, 1)
+        self._size += 1
+
+    def appendleft(self, key: Hashable) -> None:
+        self.insert(0, key)
+
+    def insert(self, index: int, key: Hashable) -> None:
+        if key in self._block_of:
+            raise ValueError(f"Ключ {key!r} вже є в індексі")
+        if index >= self._size:
+            self.append(key)
+            return
+        pos, offset = self._locate(max(0, index))
+        block = self._blocks[pos]
+        block.insert(offset, key)
+        self._block_of[key] = block
+        self._add(pos, 1)
+        self._size += 1
+        if len(block) > 2 * self._LOAD:
+            self._split(pos)
+
+    def _split(self, pos: int) -> None:
+        block = self._blocks[pos]
+        half = len(block) // 2
+        tail = block[half:]
+        del block[half:]
+        self._blocks.insert(pos + 1, tail)
+        for key in tail:
+            self._block_of[key] = tail
+        self._reindex()
+
+    def remove(self, key: Hashable) -> None:
+        block = self._block_of.pop(key)
+        block.remove(key)
+        self._size -= 1
+        pos = self._pos[id(block)]
+        if block:
+            self._add(pos, -1)
+        else:
+            del self._blocks[pos]
+            self._reindex()
+
+    def to_list(self) -> List[Any]:
+        return list(self)
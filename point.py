@@ -1,11 +1,32 @@
+import gc
+import os
 import random
-from typing import Optional, List
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, Optional, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from location_catalog import LocationCatalog
+from surface_classifier import SurfaceClassifier
+
+SURFACES = ('материк', 'острів', 'океан', 'озеро')
+LAND_SURFACES = ('материк', 'острів')
+SURFACE_CODES = {name: code for code, name in enumerate(SURFACES)}
+LAT_HEMISPHERES = ('N', 'S')
+LON_HEMISPHERES = ('E', 'W')
+_GENERATE_CHUNK = 1 << 16
 
 
 class MapPoint:
+    __slots__ = ('_id', '_latitude', '_longitude', '_lat_hem', '_lon_hem', '_surface_code', '_location_name')
+
     _instance_counter: int = 0
-    _location_names: Optional[List[str]] = None
-    _locations_file_missing: bool = False
+    _catalog: LocationCatalog = LocationCatalog('locations.txt')
+    _classifier: SurfaceClassifier = SurfaceClassifier()
 
     def __init__(self, manual_data: Optional[dict] = None):
         self._id = MapPoint._instance_counter
@@ -21,89 +42,179 @@ class MapPoint:
             except (TypeError, ValueError):
                 raise ValueError("Некоректні manual_data для MapPoint")
 
-            if lat_hem not in ('N', 'S') or lon_hem not in ('E', 'W'):
-                raise ValueError("Півкулі повинні бути 'N'/'S' та 'E'/'W'")
-
-            if not (0.0 <= lat <= 90.0):
-                raise ValueError("Широта повинна бути в межах 0..90")
-            if not (0.0 <= lon <= 180.0):
-                raise ValueError("Довгота повинна бути в межах 0..180")
-
-            self._latitude = round(lat, 4)
-            self._latitude_hemisphere = lat_hem
-            self._longitude = round(lon, 4)
-            self._longitude_hemisphere = lon_hem
-            self._location_name = loc if loc else self._get_random_location()
+            self._set_coordinates(*self.validate_coordinates(lat, lat_hem, lon, lon_hem))
+            self._location_name = sys.intern(loc) if loc else self._get_random_location()
         else:
-            self._latitude_hemisphere = random.choice(['N', 'S'])
+            self._lat_hem = random.randrange(2)
             self._latitude = round(random.uniform(0, 90), 4)
-            self._longitude_hemisphere = random.choice(['E', 'W'])
+            self._lon_hem = random.randrange(2)
             self._longitude = round(random.uniform(0, 180), 4)
             self._location_name = self._get_random_location()
 
         self._recalculate_surface()
 
-    def _get_random_location(self) -> str:
-        if MapPoint._locations_file_missing:
-            return "Невідоме місце (файл locations.txt не знайдено)"
-
-        if MapPoint._location_names is None:
-            try:
-                with open('locations.txt', 'r', encoding='utf-8') as f:
-                    MapPoint._location_names = [line.strip() for line in f if line.strip()]
-            except FileNotFoundError:
-                MapPoint._location_names = []
-                MapPoint._locations_file_missing = True
-                return "Невідоме місце (файл locations.txt не знайдено)"
+    @classmethod
+    def from_values(cls, lat: float, lat_hem: str, lon: float, lon_hem: str, location: str) -> 'MapPoint':
+        coords = cls.validate_coordinates(lat, lat_hem, lon, lon_hem)
+        p = cls.__new__(cls)
+        p._id = MapPoint._instance_counter
+        MapPoint._instance_counter += 1
+        p._set_coordinates(*coords)
+        loc = str(location).strip()
+        p._location_name = sys.intern(loc) if loc else p._get_random_location()
+        p._recalculate_surface()
+        return p
 
-        if not MapPoint._location_names:
-            return "Невідоме місце (файл locations.txt порожній)"
-        return random.choice(MapPoint._location_names)
+    @classmethod
+    def from_state(cls, point_id: int, lat: float, lat_hem: int, lon: float, lon_hem: int,
+                   location: str, surface_code: int) -> 'MapPoint':
+        p = cls.__new__(cls)
+        p._id = point_id
+        p._latitude = lat
+        p._lat_hem = lat_hem
+        p._longitude = lon
+        p._lon_hem = lon_hem
+        p._location_name = location
+        p._surface_code = surface_code
+        if point_id >= MapPoint._instance_counter:
+            MapPoint._instance_counter = point_id + 1
+        return p
 
-    def _recalculate_surface(self) -> None:
-        name = (self._location_name or "").lower()
-
-        ocean_keys = ['ocean', 'sea', 'океан', 'море', 'морський', 'моря', 'атлантичний', 'тихий', 'індійський']
-        lake_keys = ['lake', 'озеро', 'озер', 'байкал']
-        island_keys = ['island', 'острів', 'isla', 'insula', 'мадагаскар']
-
-        if any(k in name for k in ocean_keys):
-            self._surface = 'океан'
-        elif any(k in name for k in lake_keys):
-            self._surface = 'озеро'
-        elif any(k in name for k in island_keys):
-            self._surface = 'острів'
-        else:
-            self._surface = 'материк'
-
-    def update_coordinates(self, lat: float, lat_hem: str, lon: float, lon_hem: str) -> None:
+    @staticmethod
+    def validate_coordinates(lat, lat_hem, lon, lon_hem) -> Tuple[float, str, float, str]:
         lat_hem = str(lat_hem).upper()
         lon_hem = str(lon_hem).upper()
         if lat_hem not in ('N', 'S') or lon_hem not in ('E', 'W'):
-            raise ValueError("Півкулі повинні бути 'N'/'S' і 'E'/'W'")
-        if not (0.0 <= float(lat) <= 90.0):
+            raise ValueError("Півкулі повинні бути 'N'/'S' та 'E'/'W'")
+        try:
+            lat = float(lat)
+            lon = float(lon)
+        except (TypeError, ValueError):
+            raise ValueError("Координати повинні бути числами")
+        if not (0.0 <= lat <= 90.0):
             raise ValueError("Широта повинна бути в межах 0..90")
-        if not (0.0 <= float(lon) <= 180.0):
+        if not (0.0 <= lon <= 180.0):
             raise ValueError("Довгота повинна бути в межах 0..180")
+        return round(lat, 4), lat_hem, round(lon, 4), lon_hem
+
+    def _set_coordinates(self, lat: float, lat_hem: str, lon: float, lon_hem: str) -> None:
+        self._latitude = lat
+        self._lat_hem = LAT_HEMISPHERES.index(lat_hem)
+        self._longitude = lon
+        self._lon_hem = LON_HEMISPHERES.index(lon_hem)
 
-        self._latitude = round(float(lat), 4)
-        self._latitude_hemisphere = lat_hem
-        self._longitude = round(float(lon), 4)
-        self._longitude_hemisphere = lon_hem
+    @staticmethod
+    def _location_pool() -> List[str]:
+        return MapPoint._catalog.placeholders()
+
+    @staticmethod
+    def get_location_catalog() -> LocationCatalog:
+        return MapPoint._catalog
+
+    @staticmethod
+    def set_location_catalog(catalog: LocationCatalog) -> None:
+        MapPoint._catalog = catalog
+
+    def _get_random_location(self) -> str:
+        return random.choice(self._location_pool())
+
+    @classmethod
+    def _random_chunks(cls, count: int, choices: int, seed: Optional[int], workers: int) -> Iterator[tuple]:
+        if np is None:
+            rng = random.Random(seed)
+            columns = ([rng.randint(0, 900000) / 10000 for _ in range(count)],
+                       [rng.randrange(2) for _ in range(count)],
+                       [rng.randint(0, 1800000) / 10000 for _ in range(count)],
+                       [rng.randrange(2) for _ in range(count)],
+                       [rng.randrange(choices) for _ in range(count)])
+            for start in range(0, count, _GENERATE_CHUNK):
+                yield tuple(c[start:start + _GENERATE_CHUNK] for c in columns)
+            return
+        starts = range(0, count, _GENERATE_CHUNK)
+        seeds = np.random.SeedSequence(seed).spawn(len(starts))
+
+        def draw(start, chunk_seed):
+            n = min(_GENERATE_CHUNK, count - start)
+            rng = np.random.default_rng(chunk_seed)
+            return (rng.integers(0, 900001, n) / 10000, rng.integers(0, 2, n),
+                    rng.integers(0, 1800001, n) / 10000, rng.integers(0, 2, n),
+                    rng.integers(0, choices, n))
+
+        if workers <= 1 or len(starts) <= 1:
+            for start, chunk_seed in zip(starts, seeds):
+                yield tuple(c.tolist() for c in draw(start, chunk_seed))
+            return
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for chunk in pool.map(draw, starts, seeds):
+                yield tuple(c.tolist() for c in chunk)
+
+    @classmethod
+    def generate(cls, count: int, seed: Optional[int] = None, workers: Optional[int] = None,
+                 progress: Optional[Callable[[int, int], None]] = None) -> List['MapPoint']:
+        count = max(0, int(count))
+        if workers is None:
+            workers = os.cpu_count() or 1
+        names = cls._location_pool()
+        codes = [SURFACE_CODES[MapPoint._classifier.classify(name)] for name in names]
+        first_id = MapPoint._instance_counter
+        new = cls.__new__
+        points = []
+        append = points.append
+        chunks = cls._random_chunks(count, len(names), seed, workers)
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for start, columns in zip(range(0, count, _GENERATE_CHUNK), chunks):
+                if progress is not None:
+                    progress(start, count)
+                ids = range(first_id + start, first_id + start + len(columns[0]))
+                for point_id, lat, lat_hem, lon, lon_hem, name in zip(ids, *columns):
+                    p = new(cls)
+                    p._id = point_id
+                    p._latitude = lat
+                    p._lat_hem = lat_hem
+                    p._longitude = lon
+                    p._lon_hem = lon_hem
+                    p._location_name = names[name]
+                    p._surface_code = codes[name]
+                    append(p)
+        finally:
+            chunks.close()
+            if gc_enabled:
+                gc.enable()
+        MapPoint._instance_counter = first_id + count
+        return points
+
+    def _recalculate_surface(self) -> None:
+        self._surface_code = SURFACE_CODES[MapPoint._classifier.classify(self._location_name)]
+
+    @staticmethod
+    def configure_surface_keywords(keywords: Dict[str, Iterable[str]], cache_size: int = 4096) -> None:
+        unknown = [s for s in keywords if s not in SURFACE_CODES]
+        if unknown:
+            raise ValueError(f"Невідомі типи поверхні: {', '.join(unknown)}")
+        MapPoint._classifier = SurfaceClassifier(keywords, cache_size=cache_size)
+
+    @staticmethod
+    def get_surface_classifier() -> SurfaceClassifier:
+        return MapPoint._classifier
+
+    def update_coordinates(self, lat: float, lat_hem: str, lon: float, lon_hem: str) -> None:
+        self._set_coordinates(*self.validate_coordinates(lat, lat_hem, lon, lon_hem))
         self._recalculate_surface()
 
     def set_location_name(self, new_name: str) -> None:
-        self._location_name = str(new_name).strip()
+        self._location_name = sys.intern(str(new_name).strip())
         self._recalculate_surface()
 
     def __str__(self) -> str:
         return (f"ID: {self._id}\n"
-                f"Координати: {self._latitude}°{self._latitude_hemisphere}, {self._longitude}°{self._longitude_hemisphere}\n"
+                f"Координати: {self._latitude}°{self.latitude_hemisphere}, {self._longitude}°{self.longitude_hemisphere}\n"
                 f"Місце: {self._location_name}\n"
-                f"Тип поверхні: {self._surface}")
+                f"Тип поверхні: {self.surface}")
 
     def __repr__(self) -> str:
-        return f"MapPoint(id={self._id}, loc={self._location_name!r}, surface={self._surface!r})"
+        return f"MapPoint(id={self._id}, loc={self._location_name!r}, surface={self.surface!r})"
 
     @property
     def id(self) -> int:
@@ -115,7 +226,11 @@ class MapPoint:
 
     @property
     def surface(self) -> str:
-        return self._surface
+        return SURFACES[self._surface_code]
+
+    @property
+    def surface_code(self) -> int:
+        return self._surface_code
 
     @property
     def latitude(self) -> float:
@@ -125,13 +240,21 @@ class MapPoint:
     def longitude(self) -> float:
         return self._longitude
 
+    @property
+    def signed_latitude(self) -> float:
+        return -self._latitude if self._lat_hem else self._latitude
+
+    @property
+    def signed_longitude(self) -> float:
+        return -self._longitude if self._lon_hem else self._longitude
+
     @property
     def latitude_hemisphere(self) -> str:
-        return self._latitude_hemisphere
+        return LAT_HEMISPHERES[self._lat_hem]
 
     @property
     def longitude_hemisphere(self) -> str:
-        return self._longitude_hemisphere
+        return LON_HEMISPHERES[self._lon_hem]
 
     @staticmethod
     def get_instance_count() -> int:
@@ -147,5 +270,5 @@ class MapPoint:
         total = len(pts)
         if total == 0:
             return 0.0
-        land = sum(1 for p in pts if getattr(p, 'surface', '').lower() in ('материк', 'острів'))
+        land = sum(1 for p in pts if getattr(p, 'surface', '').lower() in LAND_SURFACES)
         return (land / total) * 100.0
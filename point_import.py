@@ -0,0 +1,120 @@
+import csv
+import json
+import os
+from itertools import islice
+from operator import itemgetter
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+from point import MapPoint
+
+FIELDS = ('lat', 'lat_hem', 'lon', 'lon_hem', 'location')
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+
+Row = Tuple[int, Union[tuple, str]]
+
+
+class ImportReport:
+    def __init__(self, max_errors: int = 1000):
+        self.accepted = 0
+        self.rejected = 0
+        self.errors: List[Tuple[int, str]] = []
+        self.max_errors = max_errors
+
+    def reject(self, line_no: int, reason: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((line_no, reason))
+
+    def __str__(self) -> str:
+        lines = [f"Імпортовано: {self.accepted}, відхилено: {self.rejected}"]
+        for line_no, reason in self.errors:
+            lines.append(f"  рядок {line_no}: {reason}")
+        if self.rejected > len(self.errors):
+            lines.append(f"  ... та ще {self.rejected - len(self.errors)}")
+        return "\n".join(lines)
+
+
+def _csv_rows(f) -> Iterator[Row]:
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        return
+    header = [h.strip().lower() for h in header]
+    missing = [name for name in FIELDS if name not in header]
+    if missing:
+        raise ValueError(f"У CSV бракує колонок: {', '.join(missing)}")
+    pick = itemgetter(*(header.index(name) for name in FIELDS))
+    width = max(header.index(name) for name in FIELDS) + 1
+    for row in reader:
+        if not row:
+            continue
+        if len(row) < width:
+            yield reader.line_num, "Недостатньо колонок"
+        else:
+            yield reader.line_num, pick(row)
+
+
+def _jsonl_rows(f) -> Iterator[Row]:
+    for line_no, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        try:
+            obj = json.loads(line)
+        except ValueError as e:
+            yield line_no, f"Некоректний JSON: {e}"
+            continue
+        if isinstance(obj, dict):
+            yield line_no, tuple(obj.get(name) for name in FIELDS)
+        elif isinstance(obj, list) and len(obj) == len(FIELDS):
+            yield line_no, tuple(obj)
+        else:
+            yield line_no, "Очікується об'єкт або масив з 5 полів"
+
+
+def _build_chunk(rows: Iterable[Row], report: ImportReport, limit: Optional[int]) -> List[MapPoint]:
+    points = []
+    for line_no, values in rows:
+        if isinstance(values, str):
+            report.reject(line_no, values)
+            continue
+        lat, lat_hem, lon, lon_hem, loc = values
+        lat_hem = str(lat_hem).strip()
+        lon_hem = str(lon_hem).strip()
+        try:
+            if limit is not None and len(points) >= limit:
+                MapPoint.validate_coordinates(lat, lat_hem, lon, lon_hem)
+                report.reject(line_no, "Перевищено ліміт точок")
+            else:
+                points.append(MapPoint.from_values(lat, lat_hem, lon, lon_hem, "" if loc is None else loc))
+        except ValueError as e:
+            report.reject(line_no, str(e))
+    return points
+
+
+def detect_format(path: str) -> str:
+    fmt = FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ValueError("Підтримуються лише файли .csv, .jsonl та .ndjson")
+    return fmt
+
+
+def import_points(manager, path: str, fmt: Optional[str] = None, chunk_size: int = 10000,
+                  encoding: str = 'utf-8', max_errors: int = 1000,
+                  progress: Optional[Callable[[int, int], None]] = None) -> ImportReport:
+    fmt = fmt or detect_format(path)
+    if fmt not in ('csv', 'jsonl'):
+        raise ValueError(f"Невідомий формат імпорту: {fmt!r}")
+    report = ImportReport(max_errors)
+    with open(path, 'r', encoding=encoding, newline='') as f:
+        size = os.fstat(f.fileno()).st_size
+        rows = _csv_rows(f) if fmt == 'csv' else _jsonl_rows(f)
+        while True:
+            if progress is not None:
+                progress(f.buffer.tell(), size)
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            points = _build_chunk(chunk, report, manager.capacity_left())
+            manager.extend_points(points)
+            report.accepted += len(points)
+    return report
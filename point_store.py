@@ -0,0 +1,121 @@
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from point import MapPoint, SURFACE_CODES
+
+
+class ColumnarPointStore:
+    _MIN_CAPACITY = 1024
+    _COLUMNS = ('_lat', '_lon', '_lat_south', '_lon_west', '_surface', '_name_idx', '_alive')
+
+    def __init__(self, points: Optional[Iterable[MapPoint]] = None):
+        if np is None:
+            raise ImportError("Для колонкового сховища потрібен пакет numpy")
+        self._names: List[str] = []
+        self._name_codes: Dict[str, int] = {}
+        self._allocate(self._MIN_CAPACITY)
+        if points is not None:
+            self.rebuild(points)
+
+    def _allocate(self, capacity: int) -> None:
+        self._lat = np.zeros(capacity, dtype=np.float64)
+        self._lon = np.zeros(capacity, dtype=np.float64)
+        self._lat_south = np.zeros(capacity, dtype=np.bool_)
+        self._lon_west = np.zeros(capacity, dtype=np.bool_)
+        self._surface = np.zeros(capacity, dtype=np.uint8)
+        self._name_idx = np.zeros(capacity, dtype=np.int32)
+        self._alive = np.zeros(capacity, dtype=np.bool_)
+        self._rows: List[Optional[MapPoint]] = []
+        self._row_of: Dict[int, int] = {}
+        self._dead = 0
+
+    def _grow(self) -> None:
+        capacity = len(self._lat) * 2
+        for name in self._COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _name_code(self, name: str) -> int:
+        code = self._name_codes.get(name)
+        if code is None:
+            code = len(self._names)
+            self._names.append(name)
+            self._name_codes[name] = code
+        return code
+
+    def _write_row(self, row: int, point: MapPoint) -> None:
+        self._lat[row] = point.latitude
+        self._lon[row] = point.longitude
+        self._lat_south[row] = point.latitude_hemisphere == 'S'
+        self._lon_west[row] = point.longitude_hemisphere == 'W'
+        self._surface[row] = point.surface_code
+        self._name_idx[row] = self._name_code(point.location_name)
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def clear(self) -> None:
+        self._allocate(self._MIN_CAPACITY)
+
+    def rebuild(self, points: Iterable[MapPoint]) -> None:
+        pts = list(points)
+        self._allocate(max(self._MIN_CAPACITY, len(pts)))
+        for p in pts:
+            self.add(p)
+
+    def add(self, point: MapPoint) -> None:
+        row = len(self._rows)
+        if row >= len(self._lat):
+            self._grow()
+        self._write_row(row, point)
+        self._alive[row] = True
+        self._rows.append(point)
+        self._row_of[point.id] = row
+
+    def update(self, point: MapPoint) -> None:
+        self._write_row(self._row_of[point.id], point)
+
+    def remove(self, point: MapPoint) -> None:
+        row = self._row_of.pop(point.id)
+        self._alive[row] = False
+        self._rows[row] = None
+        self._dead += 1
+        if self._dead > self._MIN_CAPACITY and self._dead * 2 > len(self._rows):
+            self.rebuild(p for p in self._rows if p is not None)
+
+    def _mask(self, surface: Optional[str] = None, hem_lat: Optional[str] = None,
+              hem_lon: Optional[str] = None):
+        n = len(self._rows)
+        mask = self._alive[:n].copy()
+        if surface is not None:
+            code = SURFACE_CODES.get(surface)
+            if code is None:
+                mask[:] = False
+            else:
+                mask &= self._surface[:n] == code
+        if hem_lat is not None:
+            mask &= self._lat_south[:n] == (hem_lat == 'S')
+        if hem_lon is not None:
+            mask &= self._lon_west[:n] == (hem_lon == 'W')
+        return mask
+
+    def filter(self, **criteria) -> List[MapPoint]:
+        rows = self._rows
+        return [rows[i] for i in np.flatnonzero(self._mask(**criteria))]
+
+    def count(self, **criteria) -> int:
+        return int(np.count_nonzero(self._mask(**criteria)))
+
+    def land_percentage(self) -> float:
+        total = len(self._row_of)
+        if total == 0:
+            return 0.0
+        n = len(self._rows)
+        land = np.count_nonzero(self._alive[:n] & (self._surface[:n] <= SURFACE_CODES['острів']))
+        return land / total * 100.0
@@ -0,0 +1,146 @@
+import functools
+import json
+import os
+import threading
+import time
+import types
+from typing import Callable, Dict, List, Optional
+
+ENV_VAR = 'KURSACH_PROFILE'
+ENABLED = os.environ.get(ENV_VAR, '').strip().lower() not in ('', '0', 'false', 'no')
+
+BUCKET_BOUNDS_US = tuple(2 ** i for i in range(25))
+
+
+class Histogram:
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_US) + 1)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        us = int(seconds * 1e6)
+        self.buckets[min(us.bit_length(), len(BUCKET_BOUNDS_US))] += 1
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                bound = BUCKET_BOUNDS_US[i] if i < len(BUCKET_BOUNDS_US) else self.max * 1e6
+                return min(bound / 1e6, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'total_s': self.total,
+            'mean_s': self.total / self.count if self.count else 0.0,
+            'min_s': self.min if self.count else 0.0,
+            'max_s': self.max,
+            'p50_s': self.percentile(0.5),
+            'p95_s': self.percentile(0.95),
+            'buckets_us': {str(BUCKET_BOUNDS_US[i]) if i < len(BUCKET_BOUNDS_US) else 'inf': n
+                           for i, n in enumerate(self.buckets) if n},
+        }
+
+
+class Profiler:
+    def __init__(self):
+        self.timings: Dict[str, Histogram] = {}
+        self.counters: Dict[str, int] = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            h = self.timings.get(name)
+            if h is None:
+                h = self.timings[name] = Histogram()
+            h.add(seconds)
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def reset(self) -> None:
+        with self._lock:
+            self.timings.clear()
+            self.counters.clear()
+            self.started = time.time()
+
+    def report(self, extra: Optional[Dict[str, int]] = None) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+            timings = {name: h.to_dict() for name, h in sorted(self.timings.items())}
+            started = self.started
+        counters.update(extra or {})
+        return {
+            'enabled': ENABLED,
+            'started': started,
+            'elapsed_s': time.time() - started,
+            'counters': counters,
+            'timings': timings,
+        }
+
+    def rows(self, extra: Optional[Dict[str, int]] = None) -> List[tuple]:
+        with self._lock:
+            rows = [(name, h.count, h.total, h.percentile(0.5), h.percentile(0.95), h.max)
+                    for name, h in sorted(self.timings.items())]
+            counters = {**self.counters, **(extra or {})}
+        for name, n in sorted(counters.items()):
+            rows.append((name, n, None, None, None, None))
+        return rows
+
+    def export_json(self, path: str, extra: Optional[Dict[str, int]] = None) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(extra), f, ensure_ascii=False, indent=2)
+
+
+profiler = Profiler()
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    def decorate(fn: Callable) -> Callable:
+        if not ENABLED:
+            return fn
+        label = name or fn.__qualname__
+        record = profiler.record
+        clock = time.perf_counter
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(label, clock() - start)
+        return wrapper
+    return decorate
+
+
+def instrumented(cls):
+    if not ENABLED:
+        return cls
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith('_') or not isinstance(value, types.FunctionType):
+            continue
+        setattr(cls, attr, timed(f"{cls.__name__}.{attr}")(value))
+    return cls
+
+
+def counters_snapshot(extra: Optional[Dict[str, int]] = None) -> List[tuple]:
+    return profiler.rows(extra)
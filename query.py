@@ -0,0 +1,187 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from point import MapPoint, LAT_HEMISPHERES, LON_HEMISPHERES, SURFACE_CODES
+from spatial_index import GridIndex
+
+EQ_FIELDS = ('surface', 'hem_lat', 'hem_lon')
+RANGE_FIELDS = ('lat', 'lon')
+
+
+class Predicate(ABC):
+    @abstractmethod
+    def ids(self, engine: 'QueryEngine') -> Set[int]:
+        pass
+
+    def __and__(self, other: 'Predicate') -> 'And':
+        return And(self, other)
+
+    def __or__(self, other: 'Predicate') -> 'Or':
+        return Or(self, other)
+
+
+class Eq(Predicate):
+    def __init__(self, field: str, value: str):
+        field = field.lower()
+        if field not in EQ_FIELDS:
+            raise ValueError(f"Невідоме поле для рівності: {field!r}")
+        value = str(value).strip()
+        if field == 'surface':
+            value = value.lower()
+            if value not in SURFACE_CODES:
+                raise ValueError(f"Невідомий тип поверхні: {value!r}")
+        else:
+            value = value.upper()
+            allowed = LAT_HEMISPHERES if field == 'hem_lat' else LON_HEMISPHERES
+            if value not in allowed:
+                raise ValueError(f"Півкуля повинна бути {'/'.join(allowed)}")
+        self.field = field
+        self.value = value
+
+    def ids(self, engine: 'QueryEngine') -> Set[int]:
+        return engine.postings(self.field, self.value)
+
+    def __repr__(self) -> str:
+        return f"Eq({self.field!r}, {self.value!r})"
+
+
+class Range(Predicate):
+    def __init__(self, field: str, low: float, high: float):
+        field = field.lower()
+        if field not in RANGE_FIELDS:
+            raise ValueError(f"Невідоме поле для діапазону: {field!r}")
+        low, high = float(low), float(high)
+        if low > high:
+            raise ValueError("Нижня межа діапазону більша за верхню")
+        self.field = field
+        self.low = low
+        self.high = high
+
+    def ids(self, engine: 'QueryEngine') -> Set[int]:
+        if self.field == 'lat':
+            return engine.bbox_ids(self.low, -180.0, self.high, 180.0)
+        return engine.bbox_ids(-90.0, self.low, 90.0, self.high)
+
+    def __repr__(self) -> str:
+        return f"Range({self.field!r}, {self.low}, {self.high})"
+
+
+class Contains(Predicate):
+    def __init__(self, text: str):
+        self.text = str(text).strip().lower()
+        if not self.text:
+            raise ValueError("Порожній рядок для пошуку в назві")
+
+    def ids(self, engine: 'QueryEngine') -> Set[int]:
+        return engine.name_ids(self.text)
+
+    def __repr__(self) -> str:
+        return f"Contains({self.text!r})"
+
+
+class And(Predicate):
+    def __init__(self, *children: Predicate):
+        if not children:
+            raise ValueError("And потребує хоча б однієї умови")
+        self.children = children
+
+    def ids(self, engine: 'QueryEngine') -> Set[int]:
+        ranges = [c for c in self.children if isinstance(c, Range)]
+        others = [c for c in self.children if not isinstance(c, Range)]
+        sets = [c.ids(engine) for c in others]
+        if ranges:
+            lat = [c for c in ranges if c.field == 'lat']
+            lon = [c for c in ranges if c.field == 'lon']
+            min_lat = max([c.low for c in lat], default=-90.0)
+            max_lat = min([c.high for c in lat], default=90.0)
+            min_lon = max([c.low for c in lon], default=-180.0)
+            max_lon = min([c.high for c in lon], default=180.0)
+            if min_lat > max_lat or min_lon > max_lon:
+                return set()
+            sets.append(engine.bbox_ids(min_lat, min_lon, max_lat, max_lon))
+        sets.sort(key=len)
+        result = set(sets[0])
+        for s in sets[1:]:
+            if not result:
+                break
+            result &= s
+        return result
+
+    def __repr__(self) -> str:
+        return f"And{self.children!r}"
+
+
+class Or(Predicate):
+    def __init__(self, *children: Predicate):
+        if not children:
+            raise ValueError("Or потребує хоча б однієї умови")
+        self.children = children
+
+    def ids(self, engine: 'QueryEngine') -> Set[int]:
+        result: Set[int] = set()
+        for c in self.children:
+            result |= c.ids(engine)
+        return result
+
+    def __repr__(self) -> str:
+        return f"Or{self.children!r}"
+
+
+class QueryEngine:
+    def __init__(self, spatial: GridIndex, points: Optional[Iterable[MapPoint]] = None):
+        self._spatial = spatial
+        self.clear()
+        if points is not None:
+            self.rebuild(points)
+
+    def clear(self) -> None:
+        self._postings: Dict[Tuple[str, str], Set[int]] = {}
+        self._names: Dict[str, Set[int]] = {}
+        self._lower_names: Dict[str, str] = {}
+        self._state: Dict[int, Tuple[str, str, str, str]] = {}
+
+    def rebuild(self, points: Iterable[MapPoint]) -> None:
+        self.clear()
+        for p in points:
+            self.add(p)
+
+    def add(self, point: MapPoint) -> None:
+        state = (point.surface, point.latitude_hemisphere, point.longitude_hemisphere, point.location_name)
+        self._state[point.id] = state
+        for field, value in zip(EQ_FIELDS, state):
+            self._postings.setdefault((field, value), set()).add(point.id)
+        ids = self._names.get(state[3])
+        if ids is None:
+            self._names[state[3]] = ids = set()
+            self._lower_names[state[3]] = state[3].lower()
+        ids.add(point.id)
+
+    def remove(self, point: MapPoint) -> None:
+        state = self._state.pop(point.id)
+        for field, value in zip(EQ_FIELDS, state):
+            self._postings[(field, value)].discard(point.id)
+        ids = self._names[state[3]]
+        ids.discard(point.id)
+        if not ids:
+            del self._names[state[3]]
+            del self._lower_names[state[3]]
+
+    def update(self, point: MapPoint) -> None:
+        self.remove(point)
+        self.add(point)
+
+    def postings(self, field: str, value: str) -> Set[int]:
+        return self._postings.get((field, value), set())
+
+    def name_ids(self, text: str) -> Set[int]:
+        result: Set[int] = set()
+        for name, lower in self._lower_names.items():
+            if text in lower:
+                result |= self._names[name]
+        return result
+
+    def bbox_ids(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> Set[int]:
+        return {p.id for p in self._spatial.query_bbox(min_lat, min_lon, max_lat, max_lon)}
+
+    def evaluate(self, predicate: Predicate) -> Set[int]:
+        return set(predicate.ids(self))
@@ -0,0 +1,145 @@
+import mmap
+import os
+import struct
+import sys
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sized
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from point import MapPoint
+
+MAGIC = b'KMAPSNP1'
+VERSION = 1
+HEADER = struct.Struct('<8sIQIQQQ')
+RECORD = struct.Struct('<qddIBBBx')
+NAME_LEN = struct.Struct('<I')
+PROGRESS_EVERY = 65536
+
+if np is not None:
+    RECORD_DTYPE = np.dtype([('id', '<i8'), ('lat', '<f8'), ('lon', '<f8'), ('name', '<u4'),
+                             ('lat_hem', 'u1'), ('lon_hem', 'u1'), ('surface', 'u1'), ('pad', 'u1')])
+
+
+def save_snapshot(points: Iterable[MapPoint], path: str,
+                  progress: Optional[Callable[[int, int], None]] = None) -> int:
+    if progress is not None and not isinstance(points, Sized):
+        points = list(points)
+    total = len(points) if progress is not None else 0
+    names: List[str] = []
+    name_idx: Dict[str, int] = {}
+    records = bytearray()
+    count = 0
+    for p in points:
+        idx = name_idx.get(p.location_name)
+        if idx is None:
+            idx = name_idx[p.location_name] = len(names)
+            names.append(p.location_name)
+        records += RECORD.pack(p.id, p.latitude, p.longitude, idx,
+                               p.latitude_hemisphere == 'S', p.longitude_hemisphere == 'W', p.surface_code)
+        count += 1
+        if progress is not None and count % PROGRESS_EVERY == 0:
+            progress(count, total)
+
+    table = bytearray()
+    for name in names:
+        raw = name.encode('utf-8')
+        table += NAME_LEN.pack(len(raw))
+        table += raw
+    names_offset = HEADER.size
+    records_offset = names_offset + len(table)
+    records_offset += -records_offset % 8
+
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, count, len(names), MapPoint.get_instance_count(),
+                                names_offset, records_offset))
+            f.write(table)
+            f.write(b'\0' * (records_offset - names_offset - len(table)))
+            f.write(records)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    return count
+
+
+class Snapshot:
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError("Файл знімка пошкоджений або порожній")
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, count, name_count, next_id, names_offset, records_offset = HEADER.unpack_from(self._mm)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("Невідомий формат файлу знімка")
+            if records_offset + count * RECORD.size > size:
+                raise ValueError("Файл знімка обрізаний")
+        except Exception:
+            self.close()
+            raise
+        self._count = count
+        self.next_id = next_id
+        self._records_offset = records_offset
+        self.names = self._read_names(names_offset, name_count)
+        self._cache: Dict[int, MapPoint] = {}
+
+    def _read_names(self, offset: int, count: int) -> List[str]:
+        names = []
+        mm = self._mm
+        for _ in range(count):
+            (length,) = NAME_LEN.unpack_from(mm, offset)
+            offset += NAME_LEN.size
+            names.append(sys.intern(mm[offset:offset + length].decode('utf-8')))
+            offset += length
+        return names
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _make_point(self, record) -> MapPoint:
+        point_id, lat, lon, name, lat_hem, lon_hem, surface = record
+        return MapPoint.from_state(point_id, lat, lat_hem, lon, lon_hem, self.names[name], surface)
+
+    def __getitem__(self, index: int) -> MapPoint:
+        if index < 0 or index >= self._count:
+            raise IndexError("Індекс виходить за межі списку")
+        p = self._cache.get(index)
+        if p is None:
+            p = self._cache[index] = self._make_point(
+                RECORD.unpack_from(self._mm, self._records_offset + index * RECORD.size))
+        return p
+
+    def __iter__(self) -> Iterator[MapPoint]:
+        end = self._records_offset + self._count * RECORD.size
+        view = memoryview(self._mm)[self._records_offset:end]
+        try:
+            for index, record in enumerate(RECORD.iter_unpack(view)):
+                p = self._cache.get(index)
+                yield p if p is not None else self._make_point(record)
+        finally:
+            view.release()
+
+    def columns(self):
+        if np is None:
+            raise ImportError("Для колонкового доступу потрібен пакет numpy")
+        return np.frombuffer(self._mm, dtype=RECORD_DTYPE, count=self._count, offset=self._records_offset)
+
+    def close(self) -> None:
+        mm = getattr(self, '_mm', None)
+        if mm is not None:
+            try:
+                mm.close()
+            except BufferError:
+                pass
+            self._mm = None
+        self._file.close()
@@ -0,0 +1,52 @@
+from functools import total_ordering
+from typing import Any, Callable, Dict, Sequence, Tuple
+
+from point import MapPoint
+
+SORT_FIELDS: Dict[str, Callable[[MapPoint], Any]] = {
+    'location': lambda p: p.location_name,
+    'id': lambda p: p.id,
+    'latitude': lambda p: p.signed_latitude,
+    'longitude': lambda p: p.signed_longitude,
+    'surface': lambda p: p.surface,
+}
+
+
+@total_ordering
+class _Descending:
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __eq__(self, other: '_Descending') -> bool:
+        return self.value == other.value
+
+    def __lt__(self, other: '_Descending') -> bool:
+        return other.value < self.value
+
+
+def parse_sort_keys(keys: Sequence[str]) -> Tuple[str, ...]:
+    parsed = []
+    for key in keys:
+        name = key.strip().lower()
+        if not name:
+            continue
+        if name.lstrip('-+') not in SORT_FIELDS:
+            raise ValueError(f"Невідомий ключ сортування: {key!r}")
+        parsed.append(name)
+    if not parsed:
+        raise ValueError("Потрібен хоча б один ключ сортування")
+    return tuple(parsed)
+
+
+def make_sort_key(keys: Sequence[str], unique: bool = False) -> Callable[[MapPoint], tuple]:
+    parsed = parse_sort_keys(keys)
+    getters = []
+    for name in parsed:
+        descending = name.startswith('-')
+        getter = SORT_FIELDS[name.lstrip('-+')]
+        getters.append((lambda p, g=getter: _Descending(g(p))) if descending else getter)
+    if unique and not any(k.lstrip('-+') == 'id' for k in parsed):
+        getters.append(SORT_FIELDS['id'])
+    return lambda p: tuple(g(p) for g in getters)
@@ -0,0 +1,132 @@
+import heapq
+import math
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from point import MapPoint
+
+CellKey = Tuple[int, int]
+
+
+class GridIndex:
+    def __init__(self, cell_size: float = 1.0, points: Optional[Iterable[MapPoint]] = None):
+        if cell_size <= 0:
+            raise ValueError("Розмір комірки повинен бути додатним")
+        self.cell_size = float(cell_size)
+        self._cells: Dict[CellKey, Dict[int, MapPoint]] = {}
+        self._cell_of: Dict[int, CellKey] = {}
+        if points is not None:
+            self.rebuild(points)
+
+    def _cell_key(self, lat: float, lon: float) -> CellKey:
+        return math.floor(lat / self.cell_size), math.floor(lon / self.cell_size)
+
+    def __len__(self) -> int:
+        return len(self._cell_of)
+
+    def clear(self) -> None:
+        self._cells = {}
+        self._cell_of = {}
+
+    def rebuild(self, points: Iterable[MapPoint]) -> None:
+        self.clear()
+        cells = self._cells
+        cell_of = self._cell_of
+        size = self.cell_size
+        floor = math.floor
+        for p in points:
+            key = floor(p.signed_latitude / size), floor(p.signed_longitude / size)
+            cell = cells.get(key)
+            if cell is None:
+                cell = cells[key] = {}
+            cell[p.id] = p
+            cell_of[p.id] = key
+
+    def add(self, point: MapPoint) -> None:
+        key = self._cell_key(point.signed_latitude, point.signed_longitude)
+        self._cells.setdefault(key, {})[point.id] = point
+        self._cell_of[point.id] = key
+
+    def remove(self, point: MapPoint) -> None:
+        key = self._cell_of.pop(point.id)
+        cell = self._cells[key]
+        del cell[point.id]
+        if not cell:
+            del self._cells[key]
+
+    def update(self, point: MapPoint) -> None:
+        key = self._cell_key(point.signed_latitude, point.signed_longitude)
+        if self._cell_of.get(point.id) == key:
+            return
+        self.remove(point)
+        self._cells.setdefault(key, {})[point.id] = point
+        self._cell_of[point.id] = key
+
+    def query_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> List[MapPoint]:
+        if min_lat > max_lat:
+            raise ValueError("min_lat не може перевищувати max_lat")
+        if min_lon > max_lon:
+            return (self.query_bbox(min_lat, min_lon, max_lat, 180.0) +
+                    self.query_bbox(min_lat, -180.0, max_lat, max_lon))
+        lo_i, lo_j = self._cell_key(min_lat, min_lon)
+        hi_i, hi_j = self._cell_key(max_lat, max_lon)
+        if (hi_i - lo_i + 1) * (hi_j - lo_j + 1) > len(self._cells):
+            keys = [k for k in self._cells if lo_i <= k[0] <= hi_i and lo_j <= k[1] <= hi_j]
+        else:
+            keys = [(i, j) for i in range(lo_i, hi_i + 1) for j in range(lo_j, hi_j + 1) if (i, j) in self._cells]
+        res = []
+        for key in keys:
+            for p in self._cells[key].values():
+                if min_lat <= p.signed_latitude <= max_lat and min_lon <= p.signed_longitude <= max_lon:
+                    res.append(p)
+        return res
+
+    def _ring(self, ci: int, cj: int, r: int) -> Iterator[CellKey]:
+        if r == 0:
+            yield ci, cj
+            return
+        for j in range(cj - r, cj + r + 1):
+            yield ci - r, j
+            yield ci + r, j
+        for i in range(ci - r + 1, ci + r):
+            yield i, cj - r
+            yield i, cj + r
+
+    def _cell_distance(self, key: CellKey, lat: float, lon: float) -> float:
+        lat0 = key[0] * self.cell_size
+        lon0 = key[1] * self.cell_size
+        dlat = max(0.0, lat0 - lat, lat - (lat0 + self.cell_size))
+        dlon = max(0.0, lon0 - lon, lon - (lon0 + self.cell_size))
+        return math.hypot(dlat, dlon)
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> List[MapPoint]:
+        if k <= 0 or not self._cell_of:
+            return []
+        best: List[Tuple[float, int, MapPoint]] = []
+
+        def consider(cell: Dict[int, MapPoint]) -> None:
+            for p in cell.values():
+                d = math.hypot(p.signed_latitude - lat, p.signed_longitude - lon)
+                item = (-d, -p.id, p)
+                if len(best) < k:
+                    heapq.heappush(best, item)
+                elif item > best[0]:
+                    heapq.heapreplace(best, item)
+
+        ci, cj = self._cell_key(lat, lon)
+        r = 0
+        while 8 * r <= len(self._cells):
+            for key in self._ring(ci, cj, r):
+                cell = self._cells.get(key)
+                if cell:
+                    consider(cell)
+            if len(best) == k and -best[0][0] <= r * self.cell_size:
+                return [p for _, _, p in sorted(best, reverse=True)]
+            r += 1
+
+        rest = sorted((self._cell_distance(key, lat, lon), key) for key in self._cells
+                      if max(abs(key[0] - ci), abs(key[1] - cj)) >= r)
+        for dist, key in rest:
+            if len(best) == k and dist > -best[0][0]:
+                break
+            consider(self._cells[key])
+        return [p for _, _, p in sorted(best, reverse=True)]
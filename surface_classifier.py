@@ -0,0 +1,54 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Mapping, Optional
+
+DEFAULT_SURFACE = 'материк'
+DEFAULT_KEYWORDS: Dict[str, tuple] = {
+    'океан': ('ocean', 'sea', 'океан', 'море', 'морський', 'моря', 'атлантичний', 'тихий', 'індійський'),
+    'озеро': ('lake', 'озеро', 'озер', 'байкал'),
+    'острів': ('island', 'острів', 'isla', 'insula', 'мадагаскар'),
+}
+
+
+class SurfaceClassifier:
+    def __init__(self, keywords: Optional[Mapping[str, Iterable[str]]] = None,
+                 default: str = DEFAULT_SURFACE, cache_size: int = 4096):
+        self.default = default
+        self.cache_size = cache_size
+        self.configure(DEFAULT_KEYWORDS if keywords is None else keywords)
+
+    def configure(self, keywords: Mapping[str, Iterable[str]]) -> None:
+        self._priority: Dict[str, int] = {}
+        self._surface_of: Dict[str, str] = {}
+        alternatives = []
+        for rank, (surface, words) in enumerate(keywords.items()):
+            self._priority[surface] = rank
+            for word in sorted({w.lower() for w in words if w}, key=len, reverse=True):
+                if word not in self._surface_of:
+                    self._surface_of[word] = surface
+                    alternatives.append(re.escape(word))
+        self.keywords = {surface: tuple(words) for surface, words in keywords.items()}
+        self._pattern = re.compile(f"(?=({'|'.join(alternatives)}))") if alternatives else None
+        self._top = next(iter(self._priority), None)
+        self._cached = lru_cache(maxsize=self.cache_size)(self._classify)
+
+    def _classify(self, name: str) -> str:
+        if self._pattern is None:
+            return self.default
+        best = None
+        for match in self._pattern.finditer(name.lower()):
+            surface = self._surface_of[match.group(1)]
+            if surface == self._top:
+                return surface
+            if best is None or self._priority[surface] < self._priority[best]:
+                best = surface
+        return best if best is not None else self.default
+
+    def classify(self, name: Optional[str]) -> str:
+        return self._cached(name or "")
+
+    def cache_info(self):
+        return self._cached.cache_info()
+
+    def cache_clear(self) -> None:
+        self._cached.cache_clear()
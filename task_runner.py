@@ -0,0 +1,140 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class Task:
+    def __init__(self, title: str, fn: Callable[['Task'], Any],
+                 on_done: Optional[Callable[[Any], None]], on_error: Optional[Callable[[BaseException], None]]):
+        self.title = title
+        self.fn = fn
+        self.on_done = on_done
+        self.on_error = on_error
+        self._cancel = threading.Event()
+        self._messages: Optional[queue.Queue] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def check(self) -> None:
+        if self._cancel.is_set():
+            raise TaskCancelled(self.title)
+
+    def progress(self, done: int, total: int, text: str = "") -> None:
+        self.check()
+        self._messages.put(('progress', self, (done, total, text)))
+
+
+class TaskRunner:
+    POLL_MS = 40
+
+    def __init__(self, root, on_progress: Callable[[Task, int, int, str], None],
+                 on_finish: Callable[[Task, str], None]):
+        self.root = root
+        self.on_progress = on_progress
+        self.on_finish = on_finish
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='gui-task')
+        self._messages: queue.Queue = queue.Queue()
+        self.current: Optional[Task] = None
+        self._poll_job = None
+
+    @property
+    def busy(self) -> bool:
+        return self.current is not None
+
+    def submit(self, title: str, fn: Callable[[Task], Any], on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[BaseException], None]] = None) -> Task:
+        if self.current is not None:
+            raise RuntimeError("Інша операція ще виконується")
+        task = Task(title, fn, on_done, on_error)
+        task._messages = self._messages
+        self.current = task
+        self._executor.submit(self._run, task)
+        if self._poll_job is None:
+            self._poll_job = self.root.after(self.POLL_MS, self._poll)
+        return task
+
+    def submit_steps(self, title: str, steps: Iterator[Tuple[int, int, str]],
+                     on_done: Optional[Callable[[Any], None]] = None,
+                     on_error: Optional[Callable[[BaseException], None]] = None) -> Task:
+        if self.current is not None:
+            raise RuntimeError("Інша операція ще виконується")
+        task = Task(title, None, on_done, on_error)
+        task._messages = self._messages
+        self.current = task
+        self.root.after(0, self._step, task, iter(steps))
+        return task
+
+    def _step(self, task: Task, steps: Iterator[Tuple[int, int, str]]) -> None:
+        if task.cancelled:
+            self._finish('cancelled', task, None)
+            return
+        try:
+            done, total, text = next(steps)
+        except StopIteration as stop:
+            self._finish('done', task, stop.value)
+            return
+        except BaseException as e:
+            self._finish('error', task, e)
+            return
+        self.on_progress(task, done, total, text)
+        self.root.after(1, self._step, task, steps)
+
+    def _run(self, task: Task) -> None:
+        try:
+            task.check()
+            result = task.fn(task)
+        except TaskCancelled:
+            self._messages.put(('cancelled', task, None))
+        except BaseException as e:
+            self._messages.put(('error', task, e))
+        else:
+            self._messages.put(('done', task, result))
+
+    def _poll(self) -> None:
+        self._poll_job = None
+        latest = None
+        while True:
+            try:
+                kind, task, payload = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                latest = (task, payload)
+                continue
+            if latest is not None and latest[0] is task:
+                latest = None
+            self._finish(kind, task, payload)
+        if latest is not None and latest[0] is self.current:
+            self.on_progress(latest[0], *latest[1])
+        if self.current is not None and self._poll_job is None:
+            self._poll_job = self.root.after(self.POLL_MS, self._poll)
+
+    def _finish(self, kind: str, task: Task, payload) -> None:
+        if task is self.current:
+            self.current = None
+        self.on_finish(task, kind)
+        if kind == 'done' and task.on_done is not None:
+            task.on_done(payload)
+        elif kind == 'error' and task.on_error is not None:
+            task.on_error(payload)
+
+    def cancel(self) -> None:
+        if self.current is not None:
+            self.current.cancel()
+
+    def shutdown(self) -> None:
+        self.cancel()
+        if self._poll_job is not None:
+            self.root.after_cancel(self._poll_job)
+            self._poll_job = None
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,102 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from journal import read_journal
+from map_manager import MapManager
+
+
+def state(p):
+    return (p.id, p.latitude, p.latitude_hemisphere, p.longitude, p.longitude_hemisphere,
+            p.location_name, p.surface)
+
+
+class SaveOverJournalTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, 'a.kmap')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_save_discards_journal_of_previous_session(self):
+        first = MapManager(capacity_mode='unlimited')
+        first.fill_random_points(10, reset_ids=True, seed=1)
+        first.save(self.path)
+        first.open_journal(self.path, replay=False)
+        first.remove_point_by_id(5)
+        first.sort_by(['latitude'])
+        first.close_journal()
+        self.assertTrue(os.path.getsize(self.path + '.journal') > 0)
+
+        second = MapManager(capacity_mode='unlimited')
+        second.fill_random_points(10, reset_ids=True, seed=2)
+        expected = [p.id for p in second.get_all_points()]
+        second.save(self.path)
+        second.open_journal(self.path, replay=False)
+        second.close_journal()
+
+        reopened = MapManager(capacity_mode='unlimited')
+        self.assertEqual(reopened.open_journal(self.path), 0)
+        self.assertEqual([p.id for p in reopened.get_all_points()], expected)
+        reopened.close_journal()
+
+    def test_reopen_after_save_does_not_replay_saved_records(self):
+        manager = MapManager(capacity_mode='unlimited')
+        manager.fill_random_points(10, reset_ids=True, seed=3)
+        manager.open_journal(self.path, replay=False)
+        manager.remove_point_by_id(5)
+        manager.save(self.path)
+        manager.open_journal(self.path)
+        manager.add_point()
+        expected = [p.id for p in manager.get_all_points()]
+        manager.close_journal()
+
+        reopened = MapManager(capacity_mode='unlimited')
+        reopened.open_journal(self.path)
+        self.assertEqual([p.id for p in reopened.get_all_points()], expected)
+        reopened.close_journal()
+
+    def test_reorder_compacts_instead_of_journaling_every_id(self):
+        manager = MapManager(capacity_mode='unlimited')
+        manager.fill_random_points(50, reset_ids=True, seed=4)
+        manager.open_journal(self.path, replay=False)
+        manager.remove_point_by_id(7)
+        manager.plan_route(time_budget=0.1)
+        expected = [p.id for p in manager.get_all_points()]
+        expected.append(manager.add_point().id)
+        manager.close_journal()
+        self.assertEqual(len(read_journal(self.path + '.journal')[0]), 1)
+
+        reopened = MapManager(capacity_mode='unlimited')
+        self.assertEqual(reopened.open_journal(self.path), 1)
+        self.assertEqual([p.id for p in reopened.get_all_points()], expected)
+        reopened.close_journal()
+
+    def test_replay_restores_every_kind_of_edit(self):
+        manager = MapManager(capacity_mode='unlimited')
+        manager.fill_random_points(200, reset_ids=True, seed=5)
+        manager.save(self.path)
+        manager.open_journal(self.path, replay=False)
+        manager.remove_point_by_id(3)
+        manager.add_point({'lat': 10, 'lat_hem': 'N', 'lon': 20, 'lon_hem': 'E', 'location': 'Озеро Світязь'})
+        manager.update_coordinates(10, 45.5, 'S', 120.25, 'W')
+        manager.set_location_name(11, 'Тихий океан')
+        manager.sort_by(['location'], persistent=True)
+        manager.add_point()
+        manager.clear_sort_order()
+        manager.sort_by(['longitude'])
+        expected = [state(p) for p in manager.get_all_points()]
+        manager.close_journal()
+
+        reopened = MapManager(capacity_mode='unlimited')
+        self.assertEqual(reopened.open_journal(self.path), 8)
+        self.assertEqual([state(p) for p in reopened.get_all_points()], expected)
+        reopened.close_journal()
+
+
+if __name__ == '__main__':
+    unittest.main()
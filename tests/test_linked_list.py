@@ -0,0 +1,89 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from linked_list import LinkedList
+
+
+class LinkedListTest(unittest.TestCase):
+    def check(self, lst, reference):
+        self.assertEqual(len(lst), len(reference))
+        self.assertEqual(list(lst), reference)
+        self.assertEqual(list(reversed(lst)), reference[::-1])
+        if reference:
+            self.assertIsNone(lst.head.prev_node)
+            self.assertIsNone(lst.tail.next_node)
+        else:
+            self.assertIsNone(lst.head)
+            self.assertIsNone(lst.tail)
+
+    def test_random_operations_match_list(self):
+        rng = random.Random(1)
+        lst = LinkedList()
+        reference = []
+        nodes = {}
+        for value in range(3000):
+            op = rng.random()
+            if op < 0.2 or not reference:
+                nodes[value] = lst.append(value)
+                reference.append(value)
+            elif op < 0.3:
+                nodes[value] = lst.appendleft(value)
+                reference.insert(0, value)
+            elif op < 0.45:
+                anchor = rng.choice(reference)
+                nodes[value] = lst.insert_before(nodes[anchor], value)
+                reference.insert(reference.index(anchor), value)
+            elif op < 0.6:
+                anchor = rng.choice(reference)
+                nodes[value] = lst.insert_after(nodes[anchor], value)
+                reference.insert(reference.index(anchor) + 1, value)
+            elif op < 0.75:
+                victim = rng.choice(reference)
+                self.assertEqual(lst.unlink(nodes.pop(victim)), victim)
+                reference.remove(victim)
+            elif op < 0.8:
+                self.assertEqual(lst.pop(), reference.pop())
+            elif op < 0.85:
+                self.assertEqual(lst.popleft(), reference.pop(0))
+            elif op < 0.9:
+                pos = rng.randrange(len(reference))
+                del lst[pos]
+                del reference[pos]
+            else:
+                pos = rng.randrange(len(reference))
+                self.assertEqual(lst[pos], reference[pos])
+            nodes = {n.data: n for n in lst.iter_nodes()}
+        self.check(lst, reference)
+
+    def test_extend_nodes_links_in_bulk(self):
+        lst = LinkedList([1, 2])
+        nodes = lst.extend_nodes([3, 4, 5])
+        self.assertEqual([n.data for n in nodes], [3, 4, 5])
+        self.assertIs(nodes[0].prev_node.data, 2)
+        self.assertIs(lst.tail, nodes[-1])
+        self.check(lst, [1, 2, 3, 4, 5])
+        empty = LinkedList()
+        self.assertEqual(empty.extend_nodes([]), [])
+        self.check(empty, [])
+        empty.extend_nodes(['a'])
+        self.check(empty, ['a'])
+
+    def test_index_errors(self):
+        lst = LinkedList([1])
+        with self.assertRaises(IndexError):
+            lst[1]
+        with self.assertRaises(IndexError):
+            lst.remove(-1)
+        lst.pop()
+        with self.assertRaises(IndexError):
+            lst.pop()
+        with self.assertRaises(IndexError):
+            lst.popleft()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from map_manager import MapManager
+from point import MapPoint
+
+
+class ResetPointsTest(unittest.TestCase):
+    def test_duplicate_ids_leave_manager_unchanged(self):
+        manager = MapManager(capacity_mode='unlimited')
+        manager.fill_random_points(50, reset_ids=True, seed=1)
+        manager.sort_by(['latitude'], persistent=True)
+        before = [p.id for p in manager.get_all_points()]
+        extra = MapPoint.generate(2000, seed=2)
+        extra.append(extra[0])
+
+        with self.assertRaises(ValueError):
+            manager.extend_points(extra)
+
+        self.assertEqual([p.id for p in manager.get_all_points()], before)
+        self.assertEqual([manager.get_order_number(pid) for pid in before], list(range(1, 51)))
+        self.assertEqual(len(manager.points_in_bbox(-90, -180, 90, 180)), 50)
+        self.assertIsNone(manager.get_point_by_id(extra[1].id))
+
+
+if __name__ == '__main__':
+    unittest.main()
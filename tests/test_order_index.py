@@ -0,0 +1,89 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from order_index import OrderIndex
+
+
+class SmallBlocks(OrderIndex):
+    _LOAD = 4
+
+
+class OrderIndexTest(unittest.TestCase):
+    def check(self, index, reference):
+        self.assertEqual(len(index), len(reference))
+        self.assertEqual(index.to_list(), reference)
+        for pos, key in enumerate(reference):
+            self.assertEqual(index.index(key), pos)
+            self.assertEqual(index[pos], key)
+            self.assertIn(key, index)
+
+    def test_random_operations_match_list(self):
+        rng = random.Random(1)
+        for cls in (SmallBlocks, OrderIndex):
+            reference = list(range(300))
+            rng.shuffle(reference)
+            index = cls(reference)
+            next_key = 300
+            for step in range(2000):
+                op = rng.random()
+                if op < 0.3:
+                    index.append(next_key)
+                    reference.append(next_key)
+                elif op < 0.6:
+                    pos = rng.randrange(len(reference) + 1)
+                    index.insert(pos, next_key)
+                    reference.insert(pos, next_key)
+                elif op < 0.65:
+                    index.appendleft(next_key)
+                    reference.insert(0, next_key)
+                elif reference:
+                    key = rng.choice(reference)
+                    index.remove(key)
+                    reference.remove(key)
+                next_key += 1
+                if step % 250 == 0:
+                    self.check(index, reference)
+            self.check(index, reference)
+
+    def test_remove_everything(self):
+        index = SmallBlocks(range(50))
+        for key in range(50):
+            index.remove(key)
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.to_list(), [])
+        index.append(7)
+        self.check(index, [7])
+
+    def test_ordered_returns_keys_in_index_order(self):
+        rng = random.Random(2)
+        reference = list(range(5000))
+        rng.shuffle(reference)
+        for cls in (SmallBlocks, OrderIndex):
+            index = cls(reference)
+            for size in (0, 1, 10, 60, 300, 5000):
+                subset = set(rng.sample(reference, size))
+                self.assertEqual(index.ordered(subset), [k for k in reference if k in subset])
+
+    def test_bisect_right_on_sorted_keys(self):
+        keys = sorted(random.Random(3).sample(range(10000), 700))
+        index = SmallBlocks(keys)
+        for value in (-1, 0, keys[0], keys[350], keys[350] + 1, keys[-1], 20000):
+            expected = sum(1 for k in keys if k <= value)
+            self.assertEqual(index.bisect_right(value, key=lambda k: k), expected)
+
+    def test_duplicate_key_rejected(self):
+        index = OrderIndex([1, 2, 3])
+        with self.assertRaises(ValueError):
+            index.append(2)
+        with self.assertRaises(ValueError):
+            index.insert(0, 3)
+        with self.assertRaises(KeyError):
+            index.index(9)
+
+
+if __name__ == '__main__':
+    unittest.main()
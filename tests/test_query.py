@@ -0,0 +1,81 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from map_manager import MapManager
+from query import And, Contains, Eq, Or, Predicate, Range
+
+
+def matches(p, predicate):
+    if isinstance(predicate, Eq):
+        value = {'surface': p.surface, 'hem_lat': p.latitude_hemisphere,
+                 'hem_lon': p.longitude_hemisphere}[predicate.field]
+        return value == predicate.value
+    if isinstance(predicate, Range):
+        value = p.signed_latitude if predicate.field == 'lat' else p.signed_longitude
+        return predicate.low <= value <= predicate.high
+    if isinstance(predicate, Contains):
+        return predicate.text in p.location_name.lower()
+    if isinstance(predicate, And):
+        return all(matches(p, c) for c in predicate.children)
+    return any(matches(p, c) for c in predicate.children)
+
+
+PREDICATES = [
+    Eq('surface', 'океан'),
+    Eq('hem_lat', 's') & Eq('hem_lon', 'E'),
+    Range('lat', -20, 35.5),
+    And(Range('lat', 0, 60), Range('lon', -100, 10), Range('lat', 10, 90)),
+    And(Range('lat', 50, 60), Range('lat', -10, 0)),
+    Contains('ОКЕАН') | Eq('surface', 'озеро'),
+    Or(Eq('hem_lon', 'W'), And(Eq('surface', 'материк'), Range('lon', 0, 90))),
+]
+
+
+class QueryEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.manager = MapManager(capacity_mode='unlimited')
+        self.manager.fill_random_points(3000, reset_ids=True, seed=5)
+
+    def assert_queries_match(self):
+        points = list(self.manager.get_all_points())
+        for predicate in PREDICATES:
+            expected = [p.id for p in points if matches(p, predicate)]
+            self.assertEqual([p.id for p in self.manager.query(predicate)], expected, predicate)
+            self.assertEqual(self.manager.query_count(predicate), len(expected), predicate)
+
+    def test_queries_match_brute_force_in_list_order(self):
+        self.assert_queries_match()
+
+    def test_indexes_follow_edits(self):
+        self.assert_queries_match()
+        rng = random.Random(6)
+        ids = [p.id for p in self.manager.get_all_points()]
+        for pid in rng.sample(ids, 300):
+            self.manager.remove_point_by_id(pid)
+        for p in rng.sample(list(self.manager.get_all_points()), 300):
+            self.manager.update_coordinates(p.id, rng.uniform(0, 90), rng.choice('NS'),
+                                            rng.uniform(0, 180), rng.choice('EW'))
+        for p in rng.sample(list(self.manager.get_all_points()), 100):
+            self.manager.set_location_name(p.id, 'Тихий океан')
+        for _ in range(200):
+            self.manager.add_point()
+        self.manager.sort_by(['latitude'])
+        self.assert_queries_match()
+
+    def test_invalid_predicates(self):
+        with self.assertRaises(ValueError):
+            Eq('surface', 'пустеля')
+        with self.assertRaises(ValueError):
+            Range('lat', 10, -10)
+        with self.assertRaises(ValueError):
+            Contains('  ')
+        with self.assertRaises(TypeError):
+            Predicate()
+
+
+if __name__ == '__main__':
+    unittest.main()
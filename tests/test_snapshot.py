@@ -0,0 +1,88 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from map_manager import MapManager
+from point import MapPoint
+from snapshot import Snapshot, save_snapshot
+
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def state(p):
+    return (p.id, p.latitude, p.latitude_hemisphere, p.longitude, p.longitude_hemisphere,
+            p.location_name, p.surface)
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, 'a.kmap')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_round_trip_preserves_points(self):
+        points = MapPoint.generate(1000, seed=1)
+        points.append(MapPoint.from_values(12.5, 'S', 170.25, 'W', 'Острів Пасхи'))
+        self.assertEqual(save_snapshot(points, self.path), len(points))
+        snapshot = Snapshot(self.path)
+        try:
+            self.assertEqual(len(snapshot), len(points))
+            self.assertEqual([state(p) for p in snapshot], [state(p) for p in points])
+            self.assertEqual(state(snapshot[len(points) - 1]), state(points[-1]))
+            self.assertGreaterEqual(snapshot.next_id, points[-1].id + 1)
+            with self.assertRaises(IndexError):
+                snapshot[len(points)]
+        finally:
+            snapshot.close()
+
+    def test_rejects_damaged_files(self):
+        save_snapshot(MapPoint.generate(10, seed=2), self.path)
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 5)
+        with self.assertRaises(ValueError):
+            Snapshot(self.path)
+        with open(self.path, 'wb') as f:
+            f.write(b'garbage')
+        with self.assertRaises(ValueError):
+            Snapshot(self.path)
+
+    def test_cancelled_save_keeps_previous_file(self):
+        save_snapshot(MapPoint.generate(10, seed=3), self.path)
+        before = read_bytes(self.path)
+
+        def cancel(done, total):
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            save_snapshot(MapPoint.generate(70000, seed=4), self.path, progress=cancel)
+        self.assertEqual(read_bytes(self.path), before)
+        self.assertFalse(os.path.exists(self.path + '.tmp'))
+
+    def test_manager_save_and_lazy_load(self):
+        manager = MapManager(capacity_mode='unlimited')
+        manager.fill_random_points(500, reset_ids=True, seed=5)
+        manager.sort_by(['location', 'latitude'])
+        expected = [state(p) for p in manager.get_all_points()]
+        ocean = manager.count_by('surface', 'океан')
+        manager.save(self.path)
+
+        loaded = MapManager(capacity_mode='unlimited')
+        self.assertEqual(loaded.load(self.path), 500)
+        self.assertEqual(loaded.get_active_count(), 500)
+        self.assertEqual(loaded.count_by('surface', 'океан'), ocean)
+        self.assertEqual(state(loaded.get_point_by_index(7)), expected[7])
+        self.assertEqual([state(p) for p in loaded.get_all_points()], expected)
+        self.assertTrue(loaded.remove_point_by_id(expected[0][0]))
+        self.assertEqual(loaded.get_active_count(), 499)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import math
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from point import MapPoint
+from spatial_index import GridIndex
+
+
+def make_point(lat, lon, name='Тест'):
+    return MapPoint.from_values(abs(lat), 'S' if lat < 0 else 'N', abs(lon), 'W' if lon < 0 else 'E', name)
+
+
+def random_points(rng, count, clustered=False):
+    if clustered:
+        return [make_point(rng.uniform(50, 50.5), rng.uniform(30, 30.5)) for _ in range(count)]
+    return [make_point(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(count)]
+
+
+class GridIndexTest(unittest.TestCase):
+    def brute_nearest(self, points, lat, lon, k):
+        ranked = sorted(points, key=lambda p: (math.hypot(p.signed_latitude - lat, p.signed_longitude - lon), p.id))
+        return [p.id for p in ranked[:k]]
+
+    def test_nearest_matches_brute_force(self):
+        rng = random.Random(1)
+        for clustered in (False, True):
+            for cell in (0.5, 5.0, 40.0):
+                points = random_points(rng, 400, clustered)
+                grid = GridIndex(cell, points)
+                for _ in range(40):
+                    lat, lon = rng.uniform(-90, 90), rng.uniform(-180, 180)
+                    for k in (1, 7, 50):
+                        self.assertEqual([p.id for p in grid.nearest(lat, lon, k)],
+                                         self.brute_nearest(points, lat, lon, k))
+
+    def test_nearest_after_remove_and_update(self):
+        rng = random.Random(2)
+        points = random_points(rng, 300)
+        grid = GridIndex(10.0, points)
+        for p in points[:100]:
+            grid.remove(p)
+        for p in points[100:150]:
+            p.update_coordinates(rng.uniform(0, 90), 'N', rng.uniform(0, 180), 'E')
+            grid.update(p)
+        alive = points[100:]
+        self.assertEqual(len(grid), len(alive))
+        for _ in range(30):
+            lat, lon = rng.uniform(-90, 90), rng.uniform(-180, 180)
+            self.assertEqual([p.id for p in grid.nearest(lat, lon, 5)], self.brute_nearest(alive, lat, lon, 5))
+
+    def test_nearest_on_empty_index(self):
+        self.assertEqual(GridIndex(1.0).nearest(0, 0, 3), [])
+        self.assertEqual(GridIndex(1.0, [make_point(1, 1)]).nearest(0, 0, 0), [])
+
+    def test_bbox_matches_brute_force_including_antimeridian(self):
+        rng = random.Random(3)
+        points = random_points(rng, 500)
+        grid = GridIndex(7.0, points)
+        boxes = [(-10, -20, 30, 40), (-90, -180, 90, 180), (20, 170, 60, -170), (0, 0, 0, 0)]
+        for min_lat, min_lon, max_lat, max_lon in boxes:
+            if min_lon <= max_lon:
+                inside = lambda p: min_lon <= p.signed_longitude <= max_lon
+            else:
+                inside = lambda p: p.signed_longitude >= min_lon or p.signed_longitude <= max_lon
+            expected = {p.id for p in points if min_lat <= p.signed_latitude <= max_lat and inside(p)}
+            self.assertEqual({p.id for p in grid.query_bbox(min_lat, min_lon, max_lat, max_lon)}, expected)
+        with self.assertRaises(ValueError):
+            grid.query_bbox(10, 0, -10, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from task_runner import TaskRunner
+
+
+class FakeRoot:
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, fn, *args):
+        self.pending.append((fn, args))
+        return len(self.pending)
+
+    def after_cancel(self, job):
+        pass
+
+    def pump(self):
+        pending, self.pending = self.pending, []
+        for fn, args in pending:
+            fn(*args)
+
+
+class TaskRunnerTest(unittest.TestCase):
+    def setUp(self):
+        self.root = FakeRoot()
+        self.finished = []
+        self.progress = []
+        self.runner = TaskRunner(self.root, lambda task, *args: self.progress.append(args),
+                                 lambda task, kind: self.finished.append(kind))
+
+    def tearDown(self):
+        self.runner.shutdown()
+
+    def wait_idle(self):
+        deadline = time.monotonic() + 5
+        while self.runner.busy and time.monotonic() < deadline:
+            self.root.pump()
+            time.sleep(0.005)
+        self.assertFalse(self.runner.busy)
+
+    def test_result_and_progress_reach_the_ui_thread(self):
+        results = []
+
+        def work(task):
+            task.progress(1, 2, "half")
+            return 42
+
+        self.runner.submit("t", work, results.append)
+        self.wait_idle()
+        self.assertEqual(results, [42])
+        self.assertEqual(self.finished, ['done'])
+
+    def test_cancel_stops_task_at_next_progress(self):
+        started = threading.Event()
+        results = []
+
+        def work(task):
+            for i in range(10 ** 6):
+                task.progress(i, 10 ** 6)
+                started.set()
+                time.sleep(0.001)
+            return 'finished'
+
+        self.runner.submit("t", work, results.append)
+        self.assertTrue(started.wait(5))
+        self.runner.cancel()
+        self.wait_idle()
+        self.assertEqual(self.finished, ['cancelled'])
+        self.assertEqual(results, [])
+
+    def test_errors_go_to_on_error(self):
+        errors = []
+
+        def work(task):
+            raise ValueError("bad")
+
+        self.runner.submit("t", work, None, errors.append)
+        self.wait_idle()
+        self.assertEqual(self.finished, ['error'])
+        self.assertIsInstance(errors[0], ValueError)
+
+    def test_only_one_task_at_a_time(self):
+        release = threading.Event()
+        self.runner.submit("t", lambda task: release.wait(5))
+        with self.assertRaises(RuntimeError):
+            self.runner.submit("u", lambda task: None)
+        release.set()
+        self.wait_idle()
+
+    def test_cancel_steps(self):
+        done = []
+
+        def steps():
+            for i in range(100):
+                yield i, 100, ""
+            return 'all'
+
+        task = self.runner.submit_steps("s", steps(), done.append)
+        self.root.pump()
+        self.root.pump()
+        task.cancel()
+        self.wait_idle()
+        self.assertEqual(self.finished, ['cancelled'])
+        self.assertEqual(done, [])
+        self.assertEqual(len(self.progress), 2)
+
+    def test_shutdown_cancels_running_task(self):
+        started = threading.Event()
+        stopped = []
+
+        def work(task):
+            started.set()
+            try:
+                while True:
+                    task.progress(0, 1)
+                    time.sleep(0.001)
+            finally:
+                stopped.append(True)
+
+        self.runner.submit("t", work)
+        self.assertTrue(started.wait(5))
+        self.runner.shutdown()
+        self.assertEqual(stopped, [True])
+
+
+if __name__ == '__main__':
+    unittest.main()
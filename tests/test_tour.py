@@ -0,0 +1,79 @@
+import math
+import os
+import random
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from point import MapPoint
+from tour import _KDTree, plan_tour, route_length
+
+
+def make_point(lat, lon):
+    return MapPoint.from_values(abs(lat), 'S' if lat < 0 else 'N', abs(lon), 'W' if lon < 0 else 'E', 'Тест')
+
+
+def unit_vectors(rng, count):
+    result = []
+    for _ in range(count):
+        phi = math.radians(rng.uniform(-90, 90))
+        lam = math.radians(rng.uniform(-180, 180))
+        result.append((math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi)))
+    return result
+
+
+class KDTreeTest(unittest.TestCase):
+    def test_nearest_matches_brute_force_after_removals(self):
+        rng = random.Random(1)
+        for deadline in (math.inf, 0.0):
+            coords = unit_vectors(rng, 400)
+            tree = _KDTree(coords, deadline)
+            for i in rng.sample(range(400), 150):
+                tree.remove(i)
+            for i in range(0, 400, 7):
+                dist = lambda j: sum((a - b) ** 2 for a, b in zip(coords[i], coords[j]))
+                alive = [j for j in range(400) if tree.alive[j] and j != i]
+                for k in (1, 8, 30):
+                    self.assertEqual([dist(j) for j in tree.nearest(i, k)], sorted(map(dist, alive))[:k])
+
+
+class PlanTourTest(unittest.TestCase):
+    def test_route_visits_every_point_once(self):
+        rng = random.Random(2)
+        points = [make_point(rng.uniform(-80, 80), rng.uniform(-180, 180)) for _ in range(500)]
+        route = plan_tour(points, time_budget=0.5)
+        self.assertEqual(sorted(p.id for p in route), sorted(p.id for p in points))
+        self.assertLess(route_length(route), route_length(points) / 5)
+
+    def test_small_inputs_are_returned_as_is(self):
+        points = [make_point(0, 0), make_point(1, 1), make_point(2, 2)]
+        self.assertEqual(plan_tour(points), points)
+        self.assertEqual(plan_tour([]), [])
+
+    def test_route_crosses_antimeridian(self):
+        lons = (179.0, -179.0, 179.5, -179.5, 179.8, -179.8)
+        route = plan_tour([make_point(0, lon) for lon in lons], time_budget=0.2)
+        order = [p.signed_longitude for p in route]
+        expected = [179.0, 179.5, 179.8, -179.8, -179.5, -179.0]
+        self.assertIn(order, (expected, expected[::-1]))
+
+    def test_clustered_points_respect_time_budget(self):
+        rng = random.Random(3)
+        points = [make_point(rng.uniform(50, 50.5), rng.uniform(30, 30.5)) for _ in range(4000)]
+        points += [make_point(rng.uniform(-80, 80), rng.uniform(-180, 180)) for _ in range(40)]
+        start = time.perf_counter()
+        route = plan_tour(points, time_budget=0.3)
+        self.assertLess(time.perf_counter() - start, 1.5)
+        self.assertEqual(len({p.id for p in route}), len(points))
+
+    def test_expired_budget_still_returns_every_point(self):
+        rng = random.Random(4)
+        points = [make_point(rng.uniform(-80, 80), rng.uniform(-180, 180)) for _ in range(3000)]
+        route = plan_tour(points, time_budget=0.0)
+        self.assertEqual(sorted(p.id for p in route), sorted(p.id for p in points))
+
+
+if __name__ == '__main__':
+    unittest.main()
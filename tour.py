@@ -0,0 +1,283 @@
+import heapq
+import math
+import time
+from collections import deque
+from typing import List, Sequence, Tuple
+
+from geo import EARTH_RADIUS_KM, point_distance
+from point import MapPoint
+
+EPS = 1e-9
+LEAF_SIZE = 8
+
+
+class _KDTree:
+    def __init__(self, coords: Sequence[Tuple[float, float, float]], deadline: float):
+        n = len(coords)
+        self.coords = coords
+        self.items = list(range(n))
+        self.axis = [-1] * n
+        self.count = [0] * n
+        self.slot = [0] * n
+        self.alive = [True] * n
+        items = self.items
+        columns = [[c[a] for c in coords] for a in range(3)]
+        stack = [(0, n)]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            m = (lo + hi) // 2
+            self.count[m] = hi - lo
+            if hi - lo <= LEAF_SIZE or time.perf_counter() > deadline:
+                continue
+            part = items[lo:hi]
+            sample = part[::(hi - lo) // 32 + 1]
+            spread = [max(map(col.__getitem__, sample)) - min(map(col.__getitem__, sample)) for col in columns]
+            a = spread.index(max(spread))
+            part.sort(key=columns[a].__getitem__)
+            items[lo:hi] = part
+            self.axis[m] = a
+            stack.append((lo, m))
+            stack.append((m + 1, hi))
+        for s, i in enumerate(items):
+            self.slot[i] = s
+
+    def remove(self, i: int) -> None:
+        s = self.slot[i]
+        lo, hi = 0, len(self.items)
+        while True:
+            m = (lo + hi) // 2
+            self.count[m] -= 1
+            if s == m or self.axis[m] < 0:
+                break
+            if s < m:
+                hi = m
+            else:
+                lo = m + 1
+        self.alive[i] = False
+
+    def nearest(self, i: int, k: int) -> List[int]:
+        coords, items, axis, count, alive = self.coords, self.items, self.axis, self.count, self.alive
+        qx, qy, qz = q = coords[i]
+        best: List[Tuple[float, int]] = []
+
+        def consider(j: int) -> None:
+            x, y, z = coords[j]
+            d = (x - qx) ** 2 + (y - qy) ** 2 + (z - qz) ** 2
+            if len(best) < k:
+                heapq.heappush(best, (-d, j))
+            elif -d > best[0][0]:
+                heapq.heapreplace(best, (-d, j))
+
+        def search(lo: int, hi: int) -> None:
+            m = (lo + hi) // 2
+            if lo >= hi or not count[m]:
+                return
+            if axis[m] < 0:
+                for j in items[lo:hi]:
+                    if alive[j] and j != i:
+                        consider(j)
+                return
+            j = items[m]
+            if alive[j] and j != i:
+                consider(j)
+            diff = q[axis[m]] - coords[j][axis[m]]
+            if diff < 0:
+                search(lo, m)
+                if len(best) < k or diff * diff < -best[0][0]:
+                    search(m + 1, hi)
+            else:
+                search(m + 1, hi)
+                if len(best) < k or diff * diff < -best[0][0]:
+                    search(lo, m)
+
+        search(0, len(items))
+        return [j for _, j in sorted(best, reverse=True)]
+
+
+class _Tour:
+    def __init__(self, points: Sequence[MapPoint], neighbours: int, deadline: float):
+        self.points = list(points)
+        n = len(self.points)
+        self.n = n
+        self.phi = [math.radians(p.signed_latitude) for p in self.points]
+        self.lam = [math.radians(p.signed_longitude) for p in self.points]
+        self.cos = [math.cos(v) for v in self.phi]
+        self.kd = _KDTree([(c * math.cos(lam), c * math.sin(lam), math.sin(phi))
+                           for phi, lam, c in zip(self.phi, self.lam, self.cos)], deadline)
+        self.neigh: List[List[int]] = [[] for _ in range(n)]
+        k = min(neighbours, n - 1)
+        for i in range(n):
+            if i & 255 == 0 and time.perf_counter() > deadline:
+                break
+            self.neigh[i] = self.kd.nearest(i, k)
+        self.tour: List[int] = []
+        self.pos: List[int] = [0] * n
+
+    def dist(self, i: int, j: int) -> float:
+        phi = self.phi
+        a = (math.sin((phi[j] - phi[i]) * 0.5) ** 2 +
+             self.cos[i] * self.cos[j] * math.sin((self.lam[j] - self.lam[i]) * 0.5) ** 2)
+        return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a if a < 1.0 else 1.0))
+
+    def build_nearest_neighbour(self, deadline: float) -> None:
+        kd = self.kd
+        alive = kd.alive
+        current = 0
+        tour = [current]
+        kd.remove(current)
+        while len(tour) < self.n:
+            if len(tour) & 255 == 0 and time.perf_counter() > deadline:
+                tour.extend(i for i in range(self.n) if alive[i])
+                break
+            nxt = next((c for c in self.neigh[current] if alive[c]), None)
+            if nxt is None:
+                nxt = kd.nearest(current, 1)[0]
+            kd.remove(nxt)
+            tour.append(nxt)
+            current = nxt
+        self.set_tour(tour)
+
+    def set_tour(self, tour: List[int]) -> None:
+        self.tour = tour
+        for i, c in enumerate(tour):
+            self.pos[c] = i
+
+    def succ(self, c: int) -> int:
+        return self.tour[(self.pos[c] + 1) % self.n]
+
+    def pred(self, c: int) -> int:
+        return self.tour[self.pos[c] - 1]
+
+    def reverse(self, a: int, b: int) -> None:
+        t, pos, n = self.tour, self.pos, self.n
+        i, j = pos[a], pos[b]
+        length = (j - i) % n + 1
+        if 2 * length > n:
+            i, j = (j + 1) % n, (i - 1) % n
+            length = n - length
+        for _ in range(length // 2):
+            ci, cj = t[i], t[j]
+            t[i] = cj
+            pos[cj] = i
+            t[j] = ci
+            pos[ci] = j
+            i = (i + 1) % n
+            j = (j - 1) % n
+
+    def two_opt(self, deadline: float) -> bool:
+        dist = self.dist
+        queue = deque(range(self.n))
+        queued = [True] * self.n
+        improved = False
+        steps = 0
+        while queue:
+            steps += 1
+            if steps & 255 == 0 and time.perf_counter() > deadline:
+                break
+            a = queue.popleft()
+            queued[a] = False
+            for forward in (True, False):
+                b = self.succ(a) if forward else self.pred(a)
+                d_ab = dist(a, b)
+                moved = False
+                for c in self.neigh[a]:
+                    d_ac = dist(a, c)
+                    if d_ac >= d_ab:
+                        break
+                    d = self.succ(c) if forward else self.pred(c)
+                    if c == b or d == a:
+                        continue
+                    delta = d_ac + dist(b, d) - d_ab - dist(c, d)
+                    if delta < -EPS:
+                        if forward:
+                            self.reverse(b, c)
+                        else:
+                            self.reverse(c, b)
+                        for x in (a, b, c, d):
+                            if not queued[x]:
+                                queued[x] = True
+                                queue.append(x)
+                        improved = moved = True
+                        break
+                if moved:
+                    break
+        return improved
+
+    def or_opt(self, deadline: float) -> bool:
+        dist = self.dist
+        n = self.n
+        improved = False
+        for a in range(n):
+            if time.perf_counter() > deadline:
+                break
+            for length in (1, 2, 3):
+                if n < length + 3:
+                    break
+                i = self.pos[a]
+                if i + length > n:
+                    continue
+                t = self.tour
+                e = t[i + length - 1]
+                p = t[i - 1]
+                nx = t[(i + length) % n]
+                gain = dist(p, a) + dist(e, nx) - dist(p, nx)
+                if gain <= EPS:
+                    continue
+                segment = set(t[i:i + length])
+                best = None
+                for end in (a, e):
+                    for c in self.neigh[end]:
+                        if c in segment or c == p:
+                            continue
+                        cn = self.succ(c)
+                        if cn in segment:
+                            continue
+                        base = dist(c, cn)
+                        plain = dist(c, a) + dist(e, cn) - base
+                        flipped = dist(c, e) + dist(a, cn) - base
+                        cost, flip = (plain, False) if plain <= flipped else (flipped, True)
+                        if cost < gain - EPS and (best is None or cost < best[0]):
+                            best = (cost, c, flip)
+                if best is None:
+                    continue
+                _, c, flip = best
+                moved = t[i:i + length]
+                if flip:
+                    moved.reverse()
+                rest = t[:i] + t[i + length:]
+                k = self.pos[c] if self.pos[c] < i else self.pos[c] - length
+                rest[k + 1:k + 1] = moved
+                self.tour = rest
+                lo, hi = min(i, k + 1), max(i + length, k + 1 + length)
+                for x in range(lo, hi):
+                    self.pos[rest[x]] = x
+                improved = True
+                break
+        return improved
+
+    def open_path(self) -> List[MapPoint]:
+        t = self.tour
+        n = self.n
+        cut = max(range(n), key=lambda i: self.dist(t[i], t[(i + 1) % n]))
+        order = t[cut + 1:] + t[:cut + 1]
+        return [self.points[i] for i in order]
+
+
+def plan_tour(points: Sequence[MapPoint], time_budget: float = 2.0, neighbours: int = 8) -> List[MapPoint]:
+    points = list(points)
+    if len(points) < 4:
+        return points
+    deadline = time.perf_counter() + time_budget
+    tour = _Tour(points, neighbours, deadline)
+    tour.build_nearest_neighbour(deadline)
+    while time.perf_counter() < deadline:
+        tour.two_opt(deadline)
+        if not tour.or_opt(deadline):
+            break
+    return tour.open_path()
+
+
+def route_length(points: Sequence[MapPoint]) -> float:
+    return sum(point_distance(a, b) for a, b in zip(points, points[1:]))